@@ -0,0 +1,226 @@
+import argparse
+import builtins
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main as game  # noqa: E402
+from bracket import bracket_odds, elo_matrix  # noqa: E402
+from match_engine import MATCH_FORMATS, simulate_match  # noqa: E402
+from match_model import CACHE_SIZE, MatchModel, get_model  # noqa: E402
+from outcome_cache import OutcomeCache  # noqa: E402
+from reporting import Reporter, SILENT  # noqa: E402
+from rng import GameRNG  # noqa: E402
+from squad import SQUAD_SIZE, XI_SIZE, BattingStats, batting_splits  # noqa: E402
+from standings import batch_semifinalists  # noqa: E402
+from tournament import play_headless_tournament  # noqa: E402
+
+
+# Hot-path benchmarks with scripted input() answers and a silent reporter.
+# Rates (units per second) are better higher; the memory figure is better lower.
+QUIET = Reporter(SILENT)
+TEAMS = [f"Team {i + 1}" for i in range(8)]
+
+
+def scripted_input(user_team="computer"):
+    """Return an input() replacement that always simulates whole innings."""
+    names = itertools.cycle(TEAMS)
+
+    def answer(prompt=""):
+        if "name of team" in prompt:
+            return next(names)
+        if "Choose your team" in prompt:
+            return user_team
+        if "heads or tails" in prompt:
+            return "heads"
+        if "bat or bowl" in prompt:
+            return "bat"
+        return "1"
+
+    return answer
+
+
+def measure(run, min_time, repeat):
+    """Call run() until min_time has passed, `repeat` times; return the best units per second."""
+    best = 0.0
+    for _ in range(repeat):
+        units = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            units += run()
+            elapsed = time.perf_counter() - start
+        best = max(best, units / elapsed)
+    return best
+
+
+def bench_user_innings(rng):
+    _, overs = game.play(game.user_batting_innings(rng=rng, reporter=QUIET))
+    return round(overs * 6)
+
+
+def bench_computer_innings(rng):
+    _, overs = game.play(game.computer_batting_innings("Team 1", rng=rng, reporter=QUIET))
+    return round(overs * 6)
+
+
+def bench_group_match(rng, user_team):
+    tables = game.initialize_group_table(TEAMS[:4]), game.initialize_group_table(TEAMS[4:])
+    game.play(game.toss_and_match_logic_with_tables((TEAMS[0], TEAMS[1]), user_team, *tables, rng=rng, reporter=QUIET))
+    return 1
+
+
+def bench_play_match(rng, user_team):
+    game.play(game.play_match(TEAMS[0], TEAMS[1], user_team, rng=rng, reporter=QUIET))
+    return 1
+
+
+def bench_simulated_match(rng, match_format, model):
+    result = simulate_match(MATCH_FORMATS[match_format], rng, model=model)
+    return sum(balls for _, _, balls, _ in result.innings)
+
+
+def bench_table_updates(rng, batch=1000):
+    table = game.initialize_group_table(TEAMS[:4])
+    schedule = game.generate_group_schedule(TEAMS[:4])
+    scores = rng.integers(100, 201, size=(batch, 2)).tolist()
+    for i, (team1_score, team2_score) in enumerate(scores):
+        team1, team2 = schedule[i % len(schedule)]
+        game.update_group_table(table, team1, team2, team1_score, team2_score, 20, 20)
+        game.reorder_group_table(table)
+    return batch
+
+
+def bench_batch_group_stages(rng, batch=10000):
+    slots = {team: i for i, team in enumerate(TEAMS)}
+    fixtures = [(slots[team1], slots[team2]) for team1, team2 in game.generate_full_schedule(TEAMS[:4], TEAMS[4:])]
+    team1, team2 = map(list, zip(*fixtures))
+    scores = rng.integers(100, 201, size=(2, batch, len(fixtures)))
+    balls = rng.integers(60, 121, size=(2, batch, len(fixtures)))
+    batch_semifinalists([0] * 4 + [1] * 4, team1, team2, scores[0], scores[1], balls[0], balls[1])
+    return batch
+
+
+def bench_bracket_odds(rng, size=64):
+    bracket_odds(np.eye(size), elo_matrix(rng.generator.normal(1500, 200, size)))
+    return 1
+
+
+def bench_career_stats(rng, batch=1000):
+    stats = BattingStats(len(TEAMS) * SQUAD_SIZE)
+    picks = rng.integers(0, 7, size=(2, batch, 120))
+    out = picks[0] == picks[1]
+    used = np.where(out.sum(axis=1) >= XI_SIZE - 1, np.argmax(out.cumsum(axis=1) == XI_SIZE - 1, axis=1) + 1, 120)
+    runs, balls, dismissals = batting_splits(picks[0], picks[1], used)
+    team = rng.integers(0, len(TEAMS), size=batch)
+    stats.record_innings(team[:, None] * SQUAD_SIZE + np.arange(XI_SIZE), runs, balls, dismissals)
+    return batch
+
+
+def bench_tournament(rng):
+    game.main(seed=int(rng.integers(0, 2 ** 32)), verbosity="silent")
+    return 1
+
+
+def bench_headless_tournament(rng):
+    play_headless_tournament(TEAMS, rng)
+    return 1
+
+
+def peak_memory_per_tournament():
+    """Return the peak traced allocation of one silent interactive tournament, in KiB."""
+    tracemalloc.start()
+    game.main(seed=0, verbosity="silent")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def run_benchmarks(min_time, repeat):
+    """Run every benchmark and return {name: {"value": ..., "unit": ...}}."""
+    rng = GameRNG(1234)
+    get_model().precompute()  # Table building is a one-off cost, not part of any hot path
+    # Each limited-overs format gets its own tables, as a tournament in that format would;
+    # longer innings have more likely totals, so more chase tables
+    models = {name: get_model() if fmt.balls == get_model().balls
+              else MatchModel(OutcomeCache(CACHE_SIZE * fmt.balls // get_model().balls), balls=fmt.balls).precompute()
+              for name, fmt in MATCH_FORMATS.items() if fmt.balls}
+    benchmarks = {
+        "user_batting_innings": ("balls/s", lambda: bench_user_innings(rng)),
+        "computer_batting_innings": ("balls/s", lambda: bench_computer_innings(rng)),
+        "group_match_cpu": ("matches/s", lambda: bench_group_match(rng, "computer")),
+        "group_match_user": ("matches/s", lambda: bench_group_match(rng, TEAMS[0])),
+        "play_match_cpu": ("matches/s", lambda: bench_play_match(rng, "computer")),
+        "play_match_user": ("matches/s", lambda: bench_play_match(rng, TEAMS[0])),
+        **{f"simulated_match_{name}": ("balls/s", lambda name=name: bench_simulated_match(rng, name, models.get(name)))
+           for name in MATCH_FORMATS},
+        "group_table_update": ("updates/s", lambda: bench_table_updates(rng)),
+        "batch_group_stages": ("stages/s", lambda: bench_batch_group_stages(rng)),
+        "career_stats": ("innings/s", lambda: bench_career_stats(rng)),
+        "bracket_odds_64": ("brackets/s", lambda: bench_bracket_odds(rng)),
+        "tournament": ("tournaments/s", lambda: bench_tournament(rng)),
+        "headless_tournament": ("tournaments/s", lambda: bench_headless_tournament(rng)),
+    }
+    results = {}
+    for name, (unit, run) in benchmarks.items():
+        results[name] = {"value": measure(run, min_time, repeat), "unit": unit}
+    results["tournament_peak_memory"] = {"value": peak_memory_per_tournament(), "unit": "KiB"}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return the names of benchmarks that regressed by more than `tolerance` against `baseline`."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        lower_is_better = result["unit"] == "KiB"
+        change = (old - new) / old if not lower_is_better else (new - old) / old
+        if change > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths.")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per measurement")
+    parser.add_argument("--repeat", type=int, default=3, help="measurements per benchmark (best is kept)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --output")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed slowdown before failing (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    builtins.input = scripted_input()
+    results = run_benchmarks(args.min_time, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    for name, result in results.items():
+        line = f"{name:<28}{result['value']:>14,.1f} {result['unit']}"
+        if baseline and name in baseline:
+            line += f"   (baseline {baseline[name]['value']:,.1f})"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
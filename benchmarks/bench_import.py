@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Import-time benchmark: each scenario runs in a fresh interpreter so the
+# numbers match what a new worker process pays at startup.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "main": "import main",
+    "tournament": "import tournament",
+    "main + pandas (eager)": "import pandas, main",
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mb = rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+except ImportError:
+    rss_mb = None
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_mb, "pandas_loaded": "pandas" in sys.modules}}))
+"""
+
+
+def measure(code, repeat):
+    """Run `code` in `repeat` fresh interpreters and return the median time and peak RSS."""
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(code=code)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out))
+    rss = [s["rss_mb"] for s in samples if s["rss_mb"] is not None]
+    return {
+        "seconds": statistics.median(s["seconds"] for s in samples),
+        "rss_mb": statistics.median(rss) if rss else None,
+        "pandas_loaded": samples[0]["pandas_loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and memory of the game modules.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="interpreters per scenario")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = {name: measure(code, args.repeat) for name, code in SCENARIOS.items()}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<24}{'import ms':>10}{'peak RSS MB':>14}  pandas loaded")
+    for name, result in results.items():
+        rss = f"{result['rss_mb']:.1f}" if result["rss_mb"] is not None else "n/a"
+        print(f"{name:<24}{result['seconds'] * 1000:>10.1f}{rss:>14}  {result['pandas_loaded']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bot import play_bot  # noqa: E402
+from server import GameServer  # noqa: E402
+
+
+# Load test for server.py: many scripted bots play whole tournaments at once
+# and every ball's round trip is timed. Without --port the server runs in this
+# process on a free local port, so the figures include the bots' own work too.
+async def load_test(sessions, verbosity, port=None, host="127.0.0.1", seed=0):
+    """Run `sessions` concurrent bots; return (per-ball latencies in seconds, elapsed seconds, champions)."""
+    latencies = []
+    server = None
+    if port is None:
+        server = await GameServer(seed, verbosity=verbosity).start(host, 0)
+        port = server.sockets[0].getsockname()[1]
+    try:
+        start = time.perf_counter()
+        champions = await asyncio.gather(*(play_bot(host, port, seed=seed + i, latencies=latencies)
+                                           for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    return np.array(latencies), elapsed, champions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the game server with concurrent scripted bots.")
+    parser.add_argument("-n", "--sessions", type=int, default=200, help="concurrent tournaments")
+    parser.add_argument("--verbosity", choices=["silent", "summary", "match", "ball"], default="ball",
+                        help="output level of the in-process server")
+    parser.add_argument("--host", default="127.0.0.1", help="address of a running server")
+    parser.add_argument("--port", type=int, default=None, help="test a running server instead of an in-process one")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the server and the bots")
+    args = parser.parse_args()
+
+    latencies, elapsed, _ = asyncio.run(load_test(args.sessions, args.verbosity, args.port, args.host, args.seed))
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"sessions        {args.sessions:>12,}")
+    print(f"balls           {len(latencies):>12,}")
+    print(f"balls/s         {len(latencies) / elapsed:>12,.1f}")
+    print(f"p50 per ball    {p50:>12.3f} ms")
+    print(f"p99 per ball    {p99:>12.3f} ms")
+    print(f"max per ball    {latencies.max() * 1000:>12.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
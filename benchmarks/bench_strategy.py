@@ -0,0 +1,98 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rng import GameRNG  # noqa: E402
+from strategy import DIFFICULTIES, MAX_PICK  # noqa: E402
+
+
+# Plays every opponent difficulty against scripted human habits and reports how
+# often the computer takes a wicket, bowling (it matches the human's number) and
+# batting (the human's guess matches the computer's number), the runs per ball it
+# scores batting, and how fast it picks. A player sees its own past picks and the
+# computer's, and whether the computer is batting.
+def uniform_player(source, history, replies, batting):
+    return source.randint(0, MAX_PICK)
+
+
+def favourite_player(source, history, replies, batting):
+    return MAX_PICK if source.random() < 0.5 else source.randint(0, MAX_PICK)
+
+
+def cycling_player(source, history, replies, batting):
+    return (history[-1] + 1) % (MAX_PICK + 1) if history else 0
+
+
+def repeating_player(source, history, replies, batting):
+    return history[-1] if history and source.random() < 0.7 else source.randint(0, MAX_PICK)
+
+
+def alternating_player(source, history, replies, batting):
+    return (4, 6)[len(history) % 2]
+
+
+def constant_player(pick):
+    def player(source, history, replies, batting):
+        return pick
+    return player
+
+
+def greedy_player(source, history, replies, batting):
+    """Reads the computer's last 50 picks: bowls its commonest number, bats the one expected to score most."""
+    recent = replies[-50:]
+    counts = [1 + recent.count(value) for value in range(MAX_PICK + 1)]
+    if batting:
+        return max(range(MAX_PICK + 1), key=counts.__getitem__)
+    total = sum(counts)
+    return max(range(MAX_PICK + 1), key=lambda value: value * (total - counts[value]))
+
+
+PLAYERS = {"uniform": uniform_player, "favourite": favourite_player, "cycling": cycling_player,
+           "repeating": repeating_player, "alternating": alternating_player, "constant 5": constant_player(5),
+           "constant 6": constant_player(6), "greedy": greedy_player}
+
+
+def wicket_rates(difficulty, player, balls, seed=0):
+    """Return (bowling wicket rate, batting wicket rate, batting runs per ball, picks/s) over `balls` of each."""
+    rng = GameRNG(seed)
+    source = random.Random(seed)
+    rates = []
+    runs = 0
+    start = time.perf_counter()
+    for batting in (False, True):
+        policy = DIFFICULTIES[difficulty]()
+        history, replies = [], []
+        wickets = 0
+        for _ in range(balls):
+            human = player(source, history, replies, batting)
+            computer = policy.pick(rng, batting)
+            policy.observe(human)
+            history.append(human)
+            replies.append(computer)
+            wickets += human == computer
+            if batting and human != computer:
+                runs += computer
+        rates.append(wickets / balls)
+    return rates[0], rates[1], runs / balls, 2 * balls / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure each opponent difficulty's wicket rate against scripted players.")
+    parser.add_argument("-n", "--balls", type=int, default=20000, help="balls per difficulty, player and side")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the players and the policies")
+    args = parser.parse_args()
+
+    print(f"{'difficulty':<12}{'player':<14}{'bowling':>10}{'batting':>10}{'runs/ball':>11}{'picks/s':>14}")
+    for difficulty in DIFFICULTIES:
+        for name, player in PLAYERS.items():
+            bowling, batting, runs, speed = wicket_rates(difficulty, player, args.balls, args.seed)
+            print(f"{difficulty:<12}{name:<14}{bowling:>10.1%}{batting:>10.1%}{runs:>11.2f}{speed:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
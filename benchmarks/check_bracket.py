@@ -0,0 +1,90 @@
+import argparse
+import itertools
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bracket import crossover_odds, elo_matrix, enumerated_odds, seeded_odds  # noqa: E402
+from formats import knockout, knockout_pairs  # noqa: E402
+
+
+# Regression check for bracket.seeded_odds: for random Elo ratings and random
+# joint group finishes, the exact odds must agree with a Monte Carlo knockout
+# that draws every group's outcome, pairs the qualifiers as play_format does and
+# plays each match with the win matrix. Crossover brackets are also checked
+# against enumerating every combination of group outcomes, which they must
+# match to rounding.
+TOLERANCE = 5  # Standard errors of the Monte Carlo estimate allowed
+CASES = (  # (groups, teams per group, qualifiers per group)
+    (2, 4, 2),
+    (4, 4, 2),
+    (1, 6, 4),
+)
+
+
+def random_finishes(rng, groups, advance):
+    """Return one random {(1st, 2nd, ...): chance} per group, over a random subset of the possible finishes."""
+    finishes = []
+    for group in groups:
+        keys = list(itertools.permutations(group, advance))
+        keys = [keys[i] for i in rng.choice(len(keys), size=min(len(keys), 12), replace=False)]
+        chances = rng.random(len(keys))
+        finishes.append(dict(zip(keys, chances / chances.sum())))
+    return finishes
+
+
+def monte_carlo_odds(rng, finishes, teams, win, n_runs):
+    """Return the share of n_runs simulated knockouts in which each team reached each round."""
+    index = {team: i for i, team in enumerate(teams)}
+    draws = [rng.choice(len(group), size=n_runs, p=list(group.values())) for group in finishes]
+    keys = [list(group) for group in finishes]
+    rounds = None
+    for run in range(n_runs):
+        qualifiers = [list(group_keys[draw[run]]) for group_keys, draw in zip(keys, draws)]
+        pairs = knockout_pairs(qualifiers)
+        results = knockout(pairs, lambda a, b: a if rng.random() < win[index[a], index[b]] else b)
+        if rounds is None:
+            rounds = np.zeros((len(results) + 1, len(teams)))
+        for r, reached in enumerate([[team for pair in pairs for team in pair]] + results):
+            rounds[r, [index[team] for team in reached]] += 1
+    return rounds / n_runs
+
+
+def check_case(rng, n_groups, size, advance, n_runs):
+    """Compare seeded_odds with Monte Carlo (and enumeration for crossovers); return the worst error in SEs."""
+    teams = [f"Team {i + 1}" for i in range(n_groups * size)]
+    groups = [teams[g * size:(g + 1) * size] for g in range(n_groups)]
+    finishes = random_finishes(rng, groups, advance)
+    win = elo_matrix(rng.normal(1500, 200, len(teams)))
+    exact = seeded_odds(finishes, teams, win)
+    if n_groups > 1 and advance == 2:
+        gap = np.abs(crossover_odds(finishes, teams, win) - enumerated_odds(finishes, teams, win)).max()
+        if gap > 1e-12:
+            raise AssertionError(f"crossover_odds differs from enumeration by {gap:.3g}.")
+    estimate = monte_carlo_odds(rng, finishes, teams, win, n_runs)
+    error = np.sqrt(np.maximum(exact * (1 - exact), 1e-6) / n_runs)
+    worst = float((np.abs(exact - estimate) / error).max())
+    if worst > TOLERANCE:
+        raise AssertionError(f"{n_groups} groups of {size}: exact and Monte Carlo odds differ by {worst:.1f} SE.")
+    return worst
+
+
+def main():
+    """Check exact seeded bracket odds against Monte Carlo from the command line."""
+    parser = argparse.ArgumentParser(description="Check bracket.seeded_odds against a Monte Carlo knockout.")
+    parser.add_argument("-n", "--runs", type=int, default=20000, help="simulated knockouts per case")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="seed of the random cases and simulations")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for n_groups, size, advance in CASES:
+        worst = check_case(rng, n_groups, size, advance, args.runs)
+        print(f"{n_groups} group(s) of {size}, top {advance} through: worst difference {worst:.2f} SE")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from server import DEFAULT_PORT
+
+
+# A scripted player for server.py. It enters team names, picks the first team,
+# calls heads, bats first and then plays every ball itself with random numbers,
+# so every ball of its matches is a round trip to the server.
+class Bot:
+    """Answers the game's prompts from its script and a random source."""
+
+    __slots__ = ("random", "team_names", "names")
+
+    def __init__(self, seed=None, team_names=None):
+        self.random = random.Random(seed)
+        self.team_names = team_names or [f"Bot Team {i + 1}" for i in range(8)]
+        self.names = iter(self.team_names)
+
+    def answer(self, prompt):
+        """Return the answer to one prompt."""
+        if "name of team" in prompt:
+            return next(self.names)
+        if "Choose your team" in prompt:
+            return self.team_names[0]
+        if "heads or tails" in prompt:
+            return "heads"
+        if "bat or bowl" in prompt:
+            return "bat"
+        if "Enter your choice" in prompt:
+            return "4"  # Ball by ball
+        return str(self.random.randint(0, 6))
+
+
+async def play_bot(host="127.0.0.1", port=DEFAULT_PORT, path=None, seed=None, latencies=None, echo=False):
+    """Play one tournament against the server and return the champion.
+
+    Seconds from answering a ball to receiving the next message are appended to
+    `latencies` when it is given.
+    """
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    bot = Bot(seed)
+    sent = None  # When the last ball was answered
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("The server closed the connection mid-game.")
+            if sent is not None and latencies is not None:
+                latencies.append(time.perf_counter() - sent)
+            message = json.loads(line)
+            if echo:
+                sys.stdout.write(message["output"])
+            if "prompt" not in message:
+                return message["champion"]
+            prompt = message["prompt"]
+            answer = bot.answer(prompt)
+            if echo:
+                print(prompt + answer)
+            writer.write(answer.encode() + b"\n")
+            sent = time.perf_counter() if prompt.startswith("Ball") else None
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play one scripted tournament against server.py.")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server TCP port")
+    parser.add_argument("--unix", default=None, metavar="PATH", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the bot's choices")
+    args = parser.parse_args()
+    champion = asyncio.run(play_bot(args.host, args.port, args.unix, args.seed, echo=True))
+    print(f"\nBot finished; champion {champion}")
+
+
+if __name__ == "__main__":
+    main()
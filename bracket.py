@@ -0,0 +1,191 @@
+import argparse
+import itertools
+
+import numpy as np
+
+from formats import knockout_pairs
+
+
+# Exact knockout odds without simulating: the chance of every team reaching and
+# winning each round of a bracket, by dynamic programming over the bracket tree.
+# A bracket is a list of slots in play order (slots 2k and 2k + 1 meet in round
+# one, their winners meet the winners of 2k + 2 and 2k + 3, and so on), each
+# holding a probability distribution over the teams that may fill it; a known
+# draw puts probability 1 on one team per slot. Every candidate for a slot is an
+# entry, and in round r an entry meets every entry of the sibling block of 2**r
+# slots, so with E entries a round costs one (E, E) product and the bracket
+# O(E**2 log E). When the qualifiers are still uncertain, seeded_odds mixes over
+# the joint group outcomes, so one team never fills two slots: a crossover
+# bracket by a second DP whose blocks carry only the outcomes of the groups at
+# their ends, other layouts by enumerating up to MAX_OUTCOMES combinations.
+# The innings model treats every team alike, so without a win matrix every match
+# is an even contest.
+MAX_OUTCOMES = 10000
+
+
+def bracket_odds(slots, win=None):
+    """Return the (rounds + 1, teams) probabilities of each team reaching each round.
+
+    `slots` is an (n_slots, n_teams) array, slots[s, t] being the chance team t
+    fills slot s; `win[i, j]` is the chance team i beats team j. Row 0 is
+    reaching the bracket and the last row winning it. Slots are filled
+    independently, so a team may be a candidate for one slot only.
+    """
+    slots = np.asarray(slots, dtype=float)
+    n_slots, n_teams = slots.shape
+    if n_slots < 2 or n_slots & (n_slots - 1):
+        raise ValueError("A knockout bracket needs a power-of-two number of teams.")
+    win = np.full((n_teams, n_teams), 0.5) if win is None else np.asarray(win, dtype=float)
+    slot, team = np.nonzero(slots)  # One entry per candidate of each slot
+    if len(np.unique(team)) != len(team):
+        raise ValueError("A team can only be a candidate for one slot; use seeded_odds for uncertain group finishes.")
+    reach = slots[slot, team]
+    beats = win[team[:, None], team[None, :]]
+    odds = [np.bincount(team, reach, minlength=n_teams)]
+    block = slot
+    while len(odds) <= n_slots.bit_length() - 1:
+        meets = (block[:, None] ^ 1) == block[None, :]  # Entries of the sibling block
+        reach = reach * (np.where(meets, beats, 0.0) @ reach)
+        odds.append(np.bincount(team, reach, minlength=n_teams))
+        block = block >> 1
+    return np.array(odds)
+
+
+def known_slots(entrants, teams):
+    """Return the slots of a drawn bracket: `entrants` in play order, as positions in `teams`."""
+    index = {team: i for i, team in enumerate(teams)}
+    slots = np.zeros((len(entrants), len(teams)))
+    slots[np.arange(len(entrants)), [index[team] for team in entrants]] = 1.0
+    return slots
+
+
+def semifinal_odds(team1, team2, team3, team4, win=None):
+    """Return {team: (chance of reaching the final, chance of the title)} for main.py's semifinals, 1 v 4 and 2 v 3.
+
+    Takes determine_semifinalists' result as is; `win` is indexed in the same order.
+    """
+    teams = [team1, team2, team3, team4]
+    final, title = bracket_odds(known_slots([team1, team4, team2, team3], teams), win)[1:]
+    return {team: (float(final[i]), float(title[i])) for i, team in enumerate(teams)}
+
+
+def seeded_odds(finishes, teams, win=None):
+    """Return bracket_odds for a knockout whose group finishes are still uncertain.
+
+    `finishes` holds one {(1st, 2nd, ...): chance} per group, the joint
+    distribution of the teams that go through in order; groups are independent
+    and the bracket is drawn as play_format draws it. A crossover bracket (two
+    qualifiers from each of two or more groups) is solved by crossover_odds in
+    polynomial time. Other layouts mix the brackets of every combination of
+    group outcomes, up to MAX_OUTCOMES combinations.
+    """
+    if len(finishes) > 1 and all(len(places) == 2 for group in finishes for places in group):
+        return crossover_odds(finishes, teams, win)
+    combinations = int(np.prod([len(group) for group in finishes]))
+    if combinations > MAX_OUTCOMES:
+        raise ValueError(f"{combinations} combinations of group outcomes are too many to enumerate "
+                         f"(at most {MAX_OUTCOMES}); only crossover brackets are solved without enumerating.")
+    return enumerated_odds(finishes, teams, win)
+
+
+def enumerated_odds(finishes, teams, win=None):
+    """Return seeded_odds by drawing the bracket of every combination of group outcomes and weighting its odds."""
+    odds = 0.0
+    for outcome in itertools.product(*(group.items() for group in finishes)):
+        qualifiers = [list(places) for places, _ in outcome]
+        entrants = [team for pair in knockout_pairs(qualifiers) for team in pair]
+        odds = odds + np.prod([chance for _, chance in outcome]) * bracket_odds(known_slots(entrants, teams), win)
+    return odds
+
+
+def crossover_odds(finishes, teams, win=None):
+    """Return seeded_odds for a crossover bracket, 1A v 2B, 1B v 2A, ..., by DP over the bracket tree.
+
+    Pair g holds group g's winner and group g + 1's runner-up, so a block of
+    pairs g..h - 1 depends on the groups inside it and on the two at its ends:
+    group g through its winner and group h through its runner-up. Each block
+    keeps, for every outcome of its two end groups, the chance of each team
+    reaching each round with its inner groups mixed in. Merging two blocks
+    mixes over the outcome of the group they share. With K outcomes per group
+    and n teams a merge costs O(K**2 n**2 + K**3 n).
+    """
+    n_groups, n_teams = len(finishes), len(teams)
+    if n_groups & (n_groups - 1):
+        raise ValueError("A knockout bracket needs a power-of-two number of teams.")
+    win = np.full((n_teams, n_teams), 0.5) if win is None else np.asarray(win, dtype=float)
+    index = {team: i for i, team in enumerate(teams)}
+    places = [np.array([[index[team] for team in key] for key in group]) for group in finishes]
+    chances = [np.array(list(group.values()), dtype=float) for group in finishes]
+
+    blocks = []
+    for g in range(n_groups):  # One pair: group g's winner against group g + 1's runner-up
+        first, second = places[g][:, 0], places[(g + 1) % n_groups][:, 1]
+        x, y = np.meshgrid(np.arange(len(first)), np.arange(len(second)), indexing="ij")
+        block = np.zeros((len(first), len(second), 2, n_teams))
+        for slot, other in ((first[x], second[y]), (second[y], first[x])):
+            block[x, y, 0, slot] = 1.0
+            block[x, y, 1, slot] = win[slot, other]
+        blocks.append(block)
+    while len(blocks) > 1:
+        merged = []
+        for (left, right), shared in zip(zip(blocks[::2], blocks[1::2]), chances[1::2]):
+            # The group between the blocks: its runner-up ends `left` and its winner starts `right`
+            merged.append(_merge_blocks(left, right, shared, win))
+        blocks, chances = merged, chances[::2]
+    both_ends = blocks[0][np.arange(len(chances[0])), np.arange(len(chances[0]))]  # Group 0 ends both sides
+    return np.tensordot(chances[0], both_ends, axes=1)
+
+
+def _merge_blocks(left, right, shared, win):
+    """Join two adjacent blocks of crossover_odds, mixing over the `shared` chances of the group between them."""
+    last = left.shape[2] - 1
+    rounds = np.einsum("z,xzrt->xrt", shared, left)[:, None] + np.einsum("z,zyrt->yrt", shared, right)[None]
+    beat_right = np.einsum("zyu,tu->zyt", right[:, :, last], win)  # Chance t beats the winner of `right`
+    beat_left = np.einsum("xzu,tu->xzt", left[:, :, last], win)
+    final = np.einsum("z,xzt,zyt->xyt", shared, left[:, :, last], beat_right) \
+        + np.einsum("z,zyt,xzt->xyt", shared, right[:, :, last], beat_left)
+    return np.concatenate((rounds, final[:, :, None]), axis=2)
+
+
+def elo_matrix(ratings):
+    """Return the win matrix of teams with Elo `ratings`: i beats j with chance 1 / (1 + 10 ** ((r_j - r_i) / 400))."""
+    ratings = np.asarray(ratings, dtype=float)
+    return 1.0 / (1.0 + 10.0 ** ((ratings[None, :] - ratings[:, None]) / 400.0))
+
+
+def display_odds(teams, odds):
+    """Print each team's chance of reaching every round, most likely champion first."""
+    rounds = len(odds) - 1
+    names = ["title" if r == rounds else "final" if r == rounds - 1 else f"last {2 ** (rounds - r)}"
+             for r in range(1, rounds + 1)]
+    print(f"{'team':<20}" + "".join(f"{name:>10}" for name in names))
+    for t in np.argsort(-odds[-1], kind="stable"):
+        print(f"{teams[t]:<20}" + "".join(f"{p:>10.1%}" for p in odds[1:, t]))
+
+
+def main():
+    """Print exact knockout odds for a drawn bracket from the command line."""
+    parser = argparse.ArgumentParser(description="Compute exact knockout-bracket odds without simulating.")
+    parser.add_argument("teams", nargs="+", metavar="TEAM[=RATING]",
+                        help="entrants in bracket order (1st v 2nd, 3rd v 4th, ...), optionally with an Elo rating")
+    parser.add_argument("--matrix", metavar="PATH",
+                        help="CSV of win probabilities, row i column j being the chance team i beats team j")
+    args = parser.parse_args()
+
+    teams, ratings = [], []
+    for text in args.teams:
+        name, _, rating = text.partition("=")
+        teams.append(name)
+        ratings.append(float(rating) if rating else 1500.0)
+    win = np.loadtxt(args.matrix, delimiter=",", ndmin=2) if args.matrix else elo_matrix(ratings)
+    if win.shape != (len(teams), len(teams)):
+        parser.error(f"The win matrix must be {len(teams)} x {len(teams)}.")
+    try:
+        odds = bracket_odds(known_slots(teams, teams), win)
+    except ValueError as error:
+        parser.error(str(error))
+    display_odds(teams, odds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+
+
+# One record per ball: 11 bytes, stored back to back after a 16 byte header.
+EVENT_DTYPE = np.dtype([
+    ("match_id", "<u4"),
+    ("innings", "u1"),
+    ("ball", "<u2"),
+    ("bat", "u1"),
+    ("bowl", "u1"),
+    ("runs", "u1"),
+    ("wicket", "?"),
+])
+MAGIC = b"HTGEVLOG"
+VERSION = 1
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("record_size", "<u4")])
+CHUNK_EVENTS = 65536
+
+
+class EventLog:
+    """Append-only ball-by-ball event sink.
+
+    Events are buffered in a preallocated record array and written out one chunk
+    at a time, so memory stays bounded however many matches are logged. Paths
+    ending in .parquet are written with pyarrow; anything else uses the raw
+    format that read_events memory-maps back.
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_EVENTS):
+        self.path = path
+        self.buffer = np.empty(chunk_size, dtype=EVENT_DTYPE)
+        self.count = 0
+        self.written = 0
+        self._parquet = None
+        if path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([(name, pa.from_numpy_dtype(EVENT_DTYPE[name])) for name in EVENT_DTYPE.names])
+            self._parquet = pq.ParquetWriter(path, schema)
+            self._file = None
+        else:
+            new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._file = open(path, "ab")
+            if new_file:
+                self._file.write(np.array((MAGIC, VERSION, EVENT_DTYPE.itemsize), dtype=HEADER).tobytes())
+            else:
+                _check_header(path)
+
+    def emit(self, match_id, innings, ball, bat, bowl):
+        """Record a single ball."""
+        if self.count == len(self.buffer):
+            self.flush()
+        wicket = bat == bowl
+        self.buffer[self.count] = (match_id, innings, ball, bat, bowl, 0 if wicket else bat, wicket)
+        self.count += 1
+
+    def emit_balls(self, match_id, innings, ball, bat, bowl):
+        """Record many balls at once; every argument may be a scalar or an array."""
+        bat, bowl = np.asarray(bat), np.asarray(bowl)
+        size = len(bat)
+        columns = {"match_id": match_id, "innings": innings, "ball": ball, "bat": bat, "bowl": bowl}
+        columns["wicket"] = bat == bowl
+        columns["runs"] = np.where(columns["wicket"], 0, bat)
+        start = 0
+        while start < size:
+            if self.count == len(self.buffer):
+                self.flush()
+            take = min(size - start, len(self.buffer) - self.count)
+            chunk = self.buffer[self.count:self.count + take]
+            for name, values in columns.items():
+                chunk[name] = values[start:start + take] if np.ndim(values) else values
+            self.count += take
+            start += take
+
+    def flush(self):
+        """Write the buffered events out."""
+        if not self.count:
+            return
+        events = self.buffer[:self.count]
+        if self._parquet is not None:
+            import pyarrow as pa
+
+            self._parquet.write_table(pa.table({name: events[name] for name in EVENT_DTYPE.names}))
+        else:
+            self._file.write(events.tobytes())
+            self._file.flush()
+        self.written += self.count
+        self.count = 0
+
+    def close(self):
+        """Flush and close the log."""
+        self.flush()
+        if self._parquet is not None:
+            self._parquet.close()
+        else:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(path):
+    """Raise ValueError if `path` is not an event log this version can read."""
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header[0]["magic"] != MAGIC or header[0]["version"] != VERSION \
+            or header[0]["record_size"] != EVENT_DTYPE.itemsize:
+        raise ValueError(f"{path} is not a version {VERSION} event log.")
+
+
+def read_events(path):
+    """Memory-map an event log as a read-only record array without copying it."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        events = np.empty(table.num_rows, dtype=EVENT_DTYPE)
+        for name in EVENT_DTYPE.names:
+            events[name] = table.column(name).to_numpy()
+        return events
+    _check_header(path)
+    if os.path.getsize(path) == HEADER.itemsize:
+        return np.empty(0, dtype=EVENT_DTYPE)
+    return np.memmap(path, dtype=EVENT_DTYPE, mode="r", offset=HEADER.itemsize)
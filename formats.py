@@ -0,0 +1,201 @@
+from itertools import combinations
+
+from standings import GroupTable
+
+
+# Tournament formats: one or two group stages followed by a knockout bracket.
+def round_robin(group, legs=1):
+    """Yield every fixture of a group; the second leg reverses home and away."""
+    for leg in range(legs):
+        for team1, team2 in combinations(group, 2):
+            yield (team1, team2) if leg % 2 == 0 else (team2, team1)
+
+
+def round_robin_size(group_size, legs=1):
+    """Return the number of fixtures round_robin yields for a group of `group_size`."""
+    return legs * group_size * (group_size - 1) // 2
+
+
+def split_groups(teams, n_groups):
+    """Split teams into n_groups consecutive groups whose sizes differ by at most one."""
+    base, extra = divmod(len(teams), n_groups)
+    groups, start = [], 0
+    for g in range(n_groups):
+        size = base + (g < extra)
+        groups.append(list(teams[start:start + size]))
+        start += size
+    return groups
+
+
+class GroupStage:
+    """A set of round-robin groups with a team -> group index for O(1) result routing."""
+
+    __slots__ = ("groups", "legs", "advance", "group_of", "tables")
+
+    def __init__(self, groups, legs=1, advance=2):
+        self.groups = [list(group) for group in groups]
+        self.legs = legs
+        self.advance = advance
+        self.group_of = {team: g for g, group in enumerate(self.groups) for team in group}
+        if len(self.group_of) != sum(len(group) for group in self.groups):
+            raise ValueError("A team can only appear in one group.")
+        if any(len(group) < max(2, advance) for group in self.groups):
+            raise ValueError(f"Every group needs at least {max(2, advance)} teams.")
+        self.tables = [GroupTable(group) for group in self.groups]
+
+    def fixtures(self):
+        """Yield (group_index, team1, team2) for every match, group by group, without building a list."""
+        for g, group in enumerate(self.groups):
+            for team1, team2 in round_robin(group, self.legs):
+                yield g, team1, team2
+
+    def fixture_count(self):
+        """Return how many fixtures fixtures() will yield."""
+        return sum(round_robin_size(len(group), self.legs) for group in self.groups)
+
+    def table_for(self, team):
+        """Return the standings of the group `team` plays in."""
+        return self.tables[self.group_of[team]]
+
+    def record(self, team1, team2, team1_score, team2_score, team1_overs, team2_overs, drawn=False):
+        """Route a result to its group's standings."""
+        self.tables[self.group_of[team1]].record_result(team1, team2, team1_score, team2_score,
+                                                        team1_overs, team2_overs, drawn)
+
+    def standings(self):
+        """Return every group's teams in ranked order."""
+        return [table.standings() for table in self.tables]
+
+    def qualifiers(self):
+        """Return the top `advance` teams of every group."""
+        return [table.top(self.advance) for table in self.tables]
+
+
+def snake_groups(seeded, n_groups):
+    """Deal a seeded list into n_groups groups in serpentine order so each group gets a spread of seeds."""
+    groups = [[] for _ in range(n_groups)]
+    for i, team in enumerate(seeded):
+        row, col = divmod(i, n_groups)
+        groups[col if row % 2 == 0 else n_groups - 1 - col].append(team)
+    return groups
+
+
+def crossover_pairs(qualifiers):
+    """Pair group winners with the runners-up of the next group: 1A v 2B, 1B v 2A, ..."""
+    n_groups = len(qualifiers)
+    pairs = []
+    for g in range(n_groups):
+        pairs.append((qualifiers[g][0], qualifiers[(g + 1) % n_groups][1]))
+    return pairs
+
+
+def seeded_pairs(seeds):
+    """Pair a seeded list for a bracket so the top two seeds can only meet in the final."""
+    if len(seeds) < 2 or len(seeds) & (len(seeds) - 1):
+        raise ValueError("A knockout bracket needs a power-of-two number of teams.")
+    slots = [0]
+    while len(slots) < len(seeds):
+        size = len(slots) * 2
+        slots = [s for slot in slots for s in (slot, size - 1 - slot)]
+    return [(seeds[slots[i]], seeds[slots[i + 1]]) for i in range(0, len(slots), 2)]
+
+
+def knockout(pairs, play_knockout_match):
+    """Play a bracket from its first-round pairs and return the list of rounds' winners."""
+    if len(pairs) & (len(pairs) - 1):
+        raise ValueError("A knockout bracket needs a power-of-two number of teams.")
+    rounds = []
+    while True:
+        winners = [play_knockout_match(team1, team2) for team1, team2 in pairs]
+        rounds.append(winners)
+        if len(winners) == 1:
+            return rounds
+        pairs = list(zip(winners[::2], winners[1::2]))
+
+
+class TournamentFormat:
+    """Shape of a tournament: groups, an optional second group stage and a knockout."""
+
+    __slots__ = ("groups", "legs", "advance", "super_groups", "super_advance")
+
+    def __init__(self, groups=2, legs=1, advance=2, super_groups=0, super_advance=2):
+        self.groups = groups
+        self.legs = legs
+        self.advance = advance
+        self.super_groups = super_groups  # 0 skips the second group stage
+        self.super_advance = super_advance
+
+    def fixture_count(self, n_teams):
+        """Return the number of group fixtures for n_teams, without building any schedule."""
+        sizes = [len(group) for group in split_groups(range(n_teams), self.groups)]
+        count = sum(round_robin_size(size, self.legs) for size in sizes)
+        if self.super_groups:
+            sizes = [len(group) for group in split_groups(range(self.groups * self.advance), self.super_groups)]
+            count += sum(round_robin_size(size, self.legs) for size in sizes)
+        return count
+
+    def knockout_size(self):
+        """Return how many teams reach the knockout."""
+        if self.super_groups:
+            return self.super_groups * self.super_advance
+        return self.groups * self.advance
+
+    def validate(self, n_teams):
+        """Raise ValueError if n_teams cannot be played in this format."""
+        if n_teams < self.groups * max(2, self.advance):
+            raise ValueError(f"{n_teams} teams cannot fill {self.groups} groups that send {self.advance} through.")
+        size = self.knockout_size()
+        if size < 2 or size & (size - 1):
+            raise ValueError("A knockout bracket needs a power-of-two number of teams.")
+
+
+T20_WORLD_CUP = TournamentFormat(groups=2, advance=2)
+SUPER_EIGHT = TournamentFormat(groups=4, advance=2, super_groups=2, super_advance=2)
+DOUBLE_ROUND_ROBIN_LEAGUE = TournamentFormat(groups=1, legs=2, advance=4)
+FORMATS = {"t20": T20_WORLD_CUP, "super8": SUPER_EIGHT, "league": DOUBLE_ROUND_ROBIN_LEAGUE}
+
+
+def _play_stage(stage, play_group_match):
+    """Play every fixture of a group stage in order."""
+    for _, team1, team2 in stage.fixtures():
+        stage.record(team1, team2, *play_group_match(team1, team2))
+
+
+def knockout_pairs(qualifiers):
+    """Return the first knockout round for a list of group qualifiers."""
+    if len(qualifiers) == 1:
+        return seeded_pairs(qualifiers[0])
+    if all(len(group) == 2 for group in qualifiers):
+        return crossover_pairs(qualifiers)
+    # Seed group winners first, then runners-up and so on
+    return seeded_pairs([group[place] for place in range(len(qualifiers[0])) for group in qualifiers])
+
+
+def play_format(teams, fmt, play_group_match, play_knockout_match):
+    """Play a whole tournament in `fmt`.
+
+    play_group_match(team1, team2) returns (team1_score, team2_score, team1_overs, team2_overs)
+    and optionally whether the match was drawn;
+    play_knockout_match(team1, team2) returns the winner. Returns a dict with the
+    group stages, the knockout entrants, every knockout round and the champion.
+    """
+    first = GroupStage(split_groups(teams, fmt.groups), fmt.legs, fmt.advance)
+    _play_stage(first, play_group_match)
+    stages = [first]
+    qualifiers = first.qualifiers()
+
+    if fmt.super_groups:
+        seeded = [group[place] for place in range(fmt.advance) for group in qualifiers]
+        second = GroupStage(snake_groups(seeded, fmt.super_groups), fmt.legs, fmt.super_advance)
+        _play_stage(second, play_group_match)
+        stages.append(second)
+        qualifiers = second.qualifiers()
+
+    pairs = knockout_pairs(qualifiers)
+    rounds = knockout(pairs, play_knockout_match)
+    return {
+        "stages": stages,
+        "knockout": [team for pair in pairs for team in pair],
+        "rounds": rounds,
+        "champion": rounds[-1][0],
+    }
@@ -0,0 +1,181 @@
+import argparse
+from functools import lru_cache
+
+import numpy as np
+
+from innings_engine import BALLS_PER_INNINGS, MAX_PICK, WICKETS_PER_INNINGS, simulate_innings_batch
+
+
+# Exact innings model: each ball is a wicket with probability 1 / (MAX_PICK + 1),
+# otherwise the batter's pick j is added with probability MAX_PICK / (MAX_PICK + 1) ** 2.
+def ball_probabilities(max_pick=MAX_PICK):
+    """Return (wicket probability, probability of each run value 0..max_pick)."""
+    sides = max_pick + 1
+    return 1 / sides, (sides - 1) / sides ** 2
+
+
+@lru_cache(maxsize=1024)
+def terminal_distribution(target=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, max_pick=MAX_PICK):
+    """Return the exact joint distribution of (balls used, final score) for one innings.
+
+    Entry [k, s] is the probability the innings ends after k balls on s runs.
+    With a target the innings stops as soon as the score reaches it.
+    """
+    p_out, p_run = ball_probabilities(max_pick)
+    width = balls * max_pick + 1 if not target else min(balls * max_pick, target - 1 + max_pick) + 1
+    live = np.zeros((wickets, width))
+    live[0, 0] = 1.0
+    ended = np.zeros((balls + 1, width))
+
+    for ball in range(1, balls + 1):
+        step = np.zeros_like(live)
+        step[1:] = live[:-1] * p_out
+        ended[ball] += live[-1] * p_out  # Last wicket falls
+        for runs in range(max_pick + 1):
+            step[:, runs:] += live[:, :width - runs] * p_run
+        if target:
+            ended[ball, target:] += step[:, target:].sum(axis=0)
+            step[:, target:] = 0.0
+        live = step
+    ended[balls] += live.sum(axis=0)
+    ended.flags.writeable = False
+    return ended
+
+
+_live_states = {}  # max_pick -> the largest live-state tensor built so far
+
+
+def live_states(balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, max_pick=MAX_PICK):
+    """Return the read-only [k, w, s] probabilities that an innings is still going after k balls on s/w.
+
+    Runs never go down, so a chase of any target passes through exactly these
+    states until its score reaches the target; every chase is a slice of them.
+    A shorter innings, or one with fewer wickets, is a slice too: the states
+    below its last wicket do not depend on how many wickets follow. So one
+    tensor per pick range is kept, grown when a larger shape is asked for.
+    """
+    live = _live_states.get(max_pick)
+    if live is None or live.shape[0] <= balls or live.shape[1] < wickets:
+        if live is not None:
+            balls, wickets = max(balls, live.shape[0] - 1), max(wickets, live.shape[1])
+        live = _live_states[max_pick] = _build_live_states(balls, wickets, max_pick)
+    return live[:balls + 1, :wickets, :balls * max_pick + 1]
+
+
+def _build_live_states(balls, wickets, max_pick):
+    """Compute the full live-state tensor of live_states."""
+    p_out, p_run = ball_probabilities(max_pick)
+    width = balls * max_pick + 1
+    live = np.zeros((balls + 1, wickets, width))
+    live[0, 0, 0] = 1.0
+    for ball in range(1, balls + 1):
+        before, after = live[ball - 1], live[ball]
+        after[1:] = before[:-1] * p_out
+        for runs in range(max_pick + 1):
+            after[:, runs:] += before[:, :width - runs] * p_run
+    live.flags.writeable = False
+    return live
+
+
+def outcome_distribution(target=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, max_pick=MAX_PICK,
+                         cutoff=0.0):
+    """Return every possible end of an innings as (runs, balls_used, wickets_lost, probability) arrays.
+
+    Outcomes less likely than `cutoff` are dropped and the rest renormalised.
+    """
+    p_out, p_run = ball_probabilities(max_pick)
+    live = live_states(balls, wickets, max_pick)
+    short = live.shape[2] if not target else min(target, live.shape[2])  # Scores that have not reached the target
+    parts = []
+
+    def collect(mass, used, lost, runs):
+        keep = np.nonzero(mass > cutoff)
+        parts.append((runs(keep), used(keep), lost(keep), mass[keep]))
+
+    # Last wicket falls on ball k + 1
+    collect(live[:-1, -1, :short] * p_out, lambda keep: keep[0] + 1,
+            lambda keep: np.full(len(keep[0]), wickets), lambda keep: keep[1])
+    # Every ball bowled without reaching the target
+    collect(live[-1, :, :short], lambda keep: np.full(len(keep[0]), balls),
+            lambda keep: keep[0], lambda keep: keep[1])
+    # Target reached on ball k + 1 by scoring `hit` from a score just short of it
+    for hit in range(1, max_pick + 1) if target else ():
+        low = max(target - hit, 0)
+        collect(live[:-1, :, low:short] * p_run, lambda keep: keep[0] + 1,
+                lambda keep: keep[1], lambda keep: keep[2] + low + hit)
+
+    runs, used, lost, prob = (np.concatenate(column) for column in zip(*parts))
+    return runs, used, lost, prob / prob.sum()
+
+
+def score_distribution(target=None, **model):
+    """Return P(final score = s) for every score s."""
+    return terminal_distribution(target, **model).sum(axis=0)
+
+
+def chase_success_probability(target, **model):
+    """Return the probability of reaching `target` runs."""
+    scores = score_distribution(**model)
+    return float(scores[target:].sum()) if target < len(scores) else 0.0
+
+
+def expected_overs(target=None, **model):
+    """Return the expected overs used by an innings, optionally chasing `target`."""
+    ended = terminal_distribution(target, **model)
+    return float(ended.sum(axis=1) @ np.arange(len(ended))) / 6
+
+
+@lru_cache(maxsize=None)
+def match_outcome_probabilities(**model):
+    """Return (P(team batting first wins), P(tie), P(chasing team wins))."""
+    scores = score_distribution(**model)
+    below = np.concatenate(([0.0], np.cumsum(scores)[:-1]))  # P(chase score < s)
+    first_wins = float(scores @ below)
+    tie = float(scores @ scores)
+    return first_wins, tie, 1.0 - first_wins - tie
+
+
+def _expected_run_rate(ended):
+    """Return E[score / overs] for a terminal distribution."""
+    balls = np.arange(1, len(ended))[:, None]
+    runs = np.arange(ended.shape[1])[None, :]
+    return float((ended[1:] * runs * 6 / balls).sum())
+
+
+@lru_cache(maxsize=None)
+def expected_net_run_rate(**model):
+    """Return the expected per-match NRR of the team batting first (score/overs difference)."""
+    first = terminal_distribution(**model)
+    scores = first.sum(axis=0)
+    chase = sum(p * _expected_run_rate(terminal_distribution(s + 1, **model))
+                for s, p in enumerate(scores) if p > 0)
+    return _expected_run_rate(first) - chase
+
+
+def total_variation_distance(scores, target=None, **model):
+    """Compare sampled final scores against the exact distribution."""
+    exact = score_distribution(target, **model)
+    sampled = np.bincount(np.asarray(scores), minlength=len(exact)) / len(scores)
+    return 0.5 * float(np.abs(sampled[:len(exact)] - exact).sum() + sampled[len(exact):].sum())
+
+
+def main():
+    """Check the sampled innings engine against the exact distribution."""
+    parser = argparse.ArgumentParser(description="Validate the sampled innings engine against the exact DP.")
+    parser.add_argument("-n", "--innings", type=int, default=200000, help="sampled innings")
+    parser.add_argument("-t", "--target", type=int, default=None, help="chase target")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="seed for the sampled innings")
+    args = parser.parse_args()
+
+    scores, _, used = simulate_innings_batch(args.innings, target=args.target, seed=args.seed)
+    exact = score_distribution(args.target)
+    print(f"Exact mean score:   {exact @ np.arange(len(exact)):.3f}   sampled: {scores.mean():.3f}")
+    print(f"Exact mean overs:   {expected_overs(args.target):.3f}   sampled: {used.mean() / 6:.3f}")
+    print(f"Total variation distance: {total_variation_distance(scores, args.target):.4f}")
+    if args.target:
+        print(f"P(chase succeeds): {chase_success_probability(args.target):.4f}   "
+              f"sampled: {(scores >= args.target).mean():.4f}")
+
+
+if __name__ == "__main__":
+    main()
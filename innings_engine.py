@@ -0,0 +1,127 @@
+import numpy as np
+
+from profiling import get_profiler
+from rng import get_rng
+
+
+# Innings model: each ball both sides pick a number between 0 and MAX_PICK.
+# Matching picks take a wicket, otherwise the batter's pick is added to the score.
+MAX_PICK = 6
+BALLS_PER_INNINGS = 120
+WICKETS_PER_INNINGS = 10
+BLOCK_BALLS = 30
+MAX_CACHED_BALLS = 300  # Longer innings (Tests) are always simulated; their tables would be too big
+
+_outcome_cache = None
+
+
+def use_outcome_cache(cache):
+    """Serve whole remaining innings from `cache` (an OutcomeCache) instead of ball by ball; None turns it off."""
+    global _outcome_cache
+    _outcome_cache = cache
+
+
+def _as_generator(rng=None, seed=None):
+    """Return the generator to draw balls from."""
+    if seed is not None:
+        return np.random.default_rng(seed)
+    return get_rng(rng)
+
+
+def _first_true(mask):
+    """Return the index of the first True per row, or the row length if there is none."""
+    hit = mask.any(axis=1)
+    return np.where(hit, mask.argmax(axis=1), mask.shape[1]), hit
+
+
+def _draw_balls(rng, n, balls, exact_seeds=None):
+    """Draw (n, balls, 2) batter/bowler picks."""
+    if exact_seeds is None:
+        return rng.integers(0, MAX_PICK + 1, size=(n, balls, 2), dtype=np.int8)
+    picks = np.empty((n, balls, 2), dtype=np.int8)
+    for i, child in enumerate(exact_seeds):
+        picks[i] = np.random.default_rng(child).integers(0, MAX_PICK + 1, size=(balls, 2), dtype=np.int8)
+    return picks
+
+
+def simulate_innings_batch(n, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, target=None,
+                           start_score=0, start_wickets=0, rng=None, seed=None, exact=False,
+                           block=BLOCK_BALLS, sink=None, match_id=0, innings=1, start_ball=0):
+    """Simulate n innings at once.
+
+    Balls are drawn for all innings together in blocks of `block` balls; the
+    wicket, all-out and target cutoffs are found with cumulative sums and argmax.
+    Returns (scores, wickets_lost, balls_used) arrays.
+
+    With exact=True each innings draws its full set of balls from its own child
+    of `seed`, so innings i gives the same result whatever n or block is.
+    If `sink` is given every ball bowled is emitted to it; `match_id` may be a
+    scalar or one id per innings.
+    """
+    scores = np.full(n, start_score, dtype=np.int64)
+    wickets_lost = np.full(n, start_wickets, dtype=np.int64)
+    balls_used = np.zeros(n, dtype=np.int64)
+    live = np.ones(n, dtype=bool)
+    if target and start_score >= target:
+        live[:] = False
+    live &= wickets_lost < wickets
+
+    exact_seeds = None
+    if exact:
+        exact_seeds = np.random.SeedSequence(seed).spawn(n)
+        block = balls
+    gen = _as_generator(rng, None if exact else seed)
+
+    while live.any():
+        idx = np.flatnonzero(live)
+        size = min(block, balls - int(balls_used[idx[0]]))
+        seeds = None if exact_seeds is None else [exact_seeds[i] for i in idx]
+        picks = _draw_balls(gen, len(idx), size, seeds)
+        out = picks[:, :, 0] == picks[:, :, 1]
+        runs = np.where(out, 0, picks[:, :, 0]).cumsum(axis=1) + scores[idx, None]
+        fallen = out.cumsum(axis=1) + wickets_lost[idx, None]
+
+        stop = fallen >= wickets
+        if target:
+            stop |= runs >= target
+        end, ended = _first_true(stop)
+        last = np.minimum(end, size - 1)
+        scores[idx] = runs[np.arange(len(idx)), last]
+        wickets_lost[idx] = fallen[np.arange(len(idx)), last]
+        if sink is not None:
+            rows, cols = np.nonzero(np.arange(size)[None, :] <= last[:, None])
+            ids = match_id[idx][rows] if np.ndim(match_id) else match_id
+            sink.emit_balls(ids, innings, start_ball + balls_used[idx][rows] + cols + 1,
+                            picks[rows, cols, 0], picks[rows, cols, 1])
+        balls_used[idx] += last + 1
+        live[idx] = ~ended & (balls_used[idx] < balls)
+    return scores, wickets_lost, balls_used
+
+
+def simulate_segment(total_score, wickets_lost, ball_count, simulate_balls, target_score=None,
+                     balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, rng=None,
+                     sink=None, match_id=0, innings=1):
+    """Simulate up to `simulate_balls` balls of a single innings in progress.
+
+    Stops early on the last wicket, the last ball or reaching the target.
+    Returns the updated (total_score, wickets_lost, ball_count). When an outcome
+    cache is in use and the rest of the innings is simulated without an event
+    sink, the result is drawn from the cached distribution instead.
+    """
+    simulate_balls = min(simulate_balls, balls - ball_count)
+    if simulate_balls <= 0 or wickets_lost >= wickets or (target_score and total_score >= target_score):
+        return total_score, wickets_lost, ball_count
+    if _outcome_cache is not None and sink is None and simulate_balls == balls - ball_count \
+            and simulate_balls <= MAX_CACHED_BALLS:
+        runs_needed = target_score - total_score if target_score else None
+        runs, used, lost = _outcome_cache.sample(get_rng(rng), simulate_balls, wickets - wickets_lost, runs_needed)
+    else:
+        scores, fallen, balls_used = simulate_innings_batch(
+            1, balls=simulate_balls, wickets=wickets, target=target_score,
+            start_score=total_score, start_wickets=wickets_lost, rng=rng, block=simulate_balls,
+            sink=sink, match_id=match_id, innings=innings, start_ball=ball_count)
+        runs, lost, used = int(scores[0]) - total_score, int(fallen[0]) - wickets_lost, int(balls_used[0])
+    profiler = get_profiler()
+    profiler.count("balls", used)
+    profiler.count("wickets", lost)
+    return total_score + runs, wickets_lost + lost, ball_count + used
@@ -1,52 +1,73 @@
-import random
-import pandas as pd
-from itertools import combinations
+import argparse
+import os
+
+from event_log import EventLog
+from formats import round_robin
+from innings_engine import BALLS_PER_INNINGS, MAX_PICK, WICKETS_PER_INNINGS, simulate_segment
+from match_engine import MATCH_FORMATS, T20, play_innings, simulate_knockout, simulate_match
+from outcome_cache import enable as enable_outcome_cache
+from profiling import enable_from as enable_profiling, finish as finish_profiling, get_profiler, timed
+from match_model import CACHE_SIZE, get_model, use_cache
+from projection import get_projection, use_projection
+from reporting import BALL, LEVELS, MATCH, SUMMARY, Reporter, get_reporter
+from rng import GameRNG, get_rng
+from snapshot import TournamentState, load_tournament, save_tournament
+from squad import SQUAD_SIZE, XI_RULE, XI_SIZE, Squads
+from strategy import DIFFICULTIES, Opponent, get_opponent
+from standings import GroupTable
 
 
 # Step 1: Setup Teams and Groups
-def setup_teams_and_groups():
-    """Ask the user for team names, divide into groups, and assign the user's team."""
-    print("Welcome to the T20 World Cup")
+@timed("setup")
+def setup_teams_and_groups(rng=None, reporter=None):
+    """Ask the user for team names, divide into groups, and assign the user's team.
+
+    Like every step that asks the user something, this is a generator: it yields
+    each prompt and expects the answer to be sent back (see play()).
+    """
+    rng = get_rng(rng)
+    reporter = get_reporter(reporter)
+    reporter.summary("Welcome to the T20 World Cup")
 
     # Ask for team names
     teams = []
-    print("\nEnter the names of 8 teams:")
+    reporter.summary("\nEnter the names of 8 teams:")
     for i in range(8):
         while True:
-            team_name = input(f"Enter the name of team {i + 1}: ").strip()
+            team_name = (yield f"Enter the name of team {i + 1}: ").strip()
             if team_name and team_name not in teams:
                 teams.append(team_name)
                 break
-            print("Invalid or duplicate team name. Please try again.")
+            reporter.summary("Invalid or duplicate team name. Please try again.")
 
     # Shuffle and divide teams into groups
-    random.shuffle(teams)
+    rng.shuffle(teams)
     group_a = teams[:4]
     group_b = teams[4:]
 
     # Display groups
-    print("\n--- Groups ---")
-    print("Group A:")
+    reporter.summary("\n--- Groups ---")
+    reporter.summary("Group A:")
     for team in group_a:
-        print(f"- {team}")
-    print("Group B:")
+        reporter.summary("- {}", team)
+    reporter.summary("Group B:")
     for team in group_b:
-        print(f"- {team}")
+        reporter.summary("- {}", team)
 
     # Assign user's team
     user_team = None
     while True:
-        chosen_team = input(
+        chosen_team = (yield
             "\nChoose your team by typing its name (or type 'computer' to let the computer control all teams): ").strip()
         if chosen_team.lower() == "computer":
-            print("\nYou chose to let the computer control all teams.")
+            reporter.summary("\nYou chose to let the computer control all teams.")
             user_team = "computer"
             break
         elif chosen_team in teams:
-            print(f"\nYou chose the team: {chosen_team}")
+            reporter.summary("\nYou chose the team: {}", chosen_team)
             user_team = chosen_team
             break
-        print("Invalid choice. Please choose a valid team name from Group A or Group B.")
+        reporter.summary("Invalid choice. Please choose a valid team name from Group A or Group B.")
 
     return group_a, group_b, user_team
 
@@ -54,9 +75,10 @@ def setup_teams_and_groups():
 # Step 2: Generate Match Schedules
 def generate_group_schedule(group):
     """Generate a schedule for matches within a group."""
-    return list(combinations(group, 2))
+    return list(round_robin(group))
 
 
+@timed("schedule")
 def generate_full_schedule(group_a, group_b):
     """Combine match schedules for both groups into a single unified schedule."""
     group_a_matches = generate_group_schedule(group_a)
@@ -64,11 +86,12 @@ def generate_full_schedule(group_a, group_b):
     return group_a_matches + group_b_matches
 
 
-def display_schedule(schedule):
+def display_schedule(schedule, reporter=None):
     """Display the complete match schedule."""
-    print("\n--- Full Match Schedule ---")
+    reporter = get_reporter(reporter)
+    reporter.summary("\n--- Full Match Schedule ---")
     for i, match in enumerate(schedule, start=1):
-        print(f"Match {i}: {match[0]} vs {match[1]}")
+        reporter.summary("Match {}: {} vs {}", i, match[0], match[1])
 
 
 
@@ -77,239 +100,285 @@ def display_schedule(schedule):
 # Step 3: Group Tables
 def initialize_group_table(group):
     """Create a table with Wins, Losses, Draws, Points, and Net Run Rate (NRR) for a group."""
-    table = {team: {"Wins": 0, "Losses": 0, "Draws": 0, "Points": 0, "Net Run Rate": 0.0} for team in group}
-    return pd.DataFrame.from_dict(table, orient="index")
+    return GroupTable(group)
 
 
 def reorder_group_table(table):
     """Reorder the group table based on Points, Wins, and Net Run Rate (NRR)."""
-    table = table.sort_values(by=["Points", "Wins", "Net Run Rate"], ascending=[False, False, False])
+    table.ranking()  # The ranking is kept in order as results come in, so there is nothing to sort
     return table
 
 
-def update_group_table(table, team1, team2, team1_score, team2_score, team1_overs, team2_overs):
-    """Update the group table after a match."""
-    # Team 1 wins
-    if team1_score > team2_score:
-        table.loc[team1, "Wins"] += 1
-        table.loc[team1, "Points"] += 2
-        table.loc[team2, "Losses"] += 1
-    # Team 2 wins
-    elif team2_score > team1_score:
-        table.loc[team2, "Wins"] += 1
-        table.loc[team2, "Points"] += 2
-        table.loc[team1, "Losses"] += 1
-    # Match is a draw
-    else:
-        table.loc[team1, "Draws"] += 1
-        table.loc[team2, "Draws"] += 1
-        table.loc[team1, "Points"] += 1
-        table.loc[team2, "Points"] += 1
-
-    # Update Net Run Rate
-    team1_nrr = (team1_score / team1_overs) - (team2_score / team2_overs)
-    team2_nrr = (team2_score / team2_overs) - (team1_score / team1_overs)
-    table.loc[team1, "Net Run Rate"] += team1_nrr
-    table.loc[team2, "Net Run Rate"] += team2_nrr
-
-    # Reorder the table after updating
-    table = reorder_group_table(table)
+@timed("table update")
+def update_group_table(table, team1, team2, team1_score, team2_score, team1_overs, team2_overs, drawn=False):
+    """Update the group table in place after a match."""
+    table.record_result(team1, team2, team1_score, team2_score, team1_overs, team2_overs, drawn)
     return table
 
 
-def display_group_table(group_name, table):
+@timed("table display")
+def display_group_table(group_name, table, reporter=None, level=MATCH):
     """Display the updated group table."""
-    print(f"\n--- {group_name} Points Table ---")
-    print(table)
-
-
-
-
+    reporter = get_reporter(reporter)
+    if reporter.enabled(level):  # Skip building the DataFrame when nobody will see it
+        reporter.emit(level, "\n--- {} Points Table ---", group_name)
+        reporter.emit(level, "{}", table.to_dataframe())
+
+
+
+
+
+def report_projection(reporter, team, total_score, wickets_lost, ball_count, target_score=None, balls=120,
+                      wickets=10):
+    """Show the projected score and the batting side's win and tie chances after a ball of an unfinished innings."""
+    if not reporter.enabled(BALL) or ball_count >= balls or wickets_lost >= wickets:
+        return
+    projection = get_projection()
+    if (balls, wickets) != (projection.balls, projection.wickets):
+        return  # The table only covers innings of its own length
+    if not target_score:
+        win, tie = projection.defend(total_score, ball_count, wickets_lost)
+        reporter.ball("Projected score: {:.0f}. Win probability: {:.1%}, tie: {:.1%}",
+                      projection.projected_score(total_score, ball_count, wickets_lost), win, tie)
+    elif total_score < target_score:
+        needed, balls_left = target_score - total_score, balls - ball_count
+        win, tie = projection.chase(total_score, target_score, ball_count, wickets_lost)
+        reporter.ball("{} need {} off {} balls (required rate {:.2f}). Projected score: {:.0f}. "
+                      "Win probability: {:.1%}, tie: {:.1%}", team, needed, balls_left, needed * 6 / balls_left,
+                      projection.projected_score(total_score, ball_count, wickets_lost, target_score), win, tie)
+
+
+def show_card(card, squads, reporter):
+    """Close an innings' batting card and show each batter's score."""
+    if card is None:
+        return
+    card.finish()
+    if reporter.enabled(MATCH):
+        for name, runs, balls, not_out in card.lines(squads.names()):
+            reporter.match("  {:<24}{:>4}{} ({})", name, runs, "*" if not_out else "", balls)
+
+
+def pick_squad(squad, reporter=None):
+    """Ask the user to name their 15-player squad and choose the XI in batting order."""
+    reporter = get_reporter(reporter)
+    reporter.summary("\nName your {}-player squad (press Enter to keep a player's default name):", SQUAD_SIZE)
+    for i, default in enumerate(squad.players):
+        name = (yield f"Player {i + 1} ({default}): ").strip()
+        if name:
+            squad.players[i] = name
+    while True:
+        answer = (yield f"Enter your XI as {XI_SIZE} squad numbers in batting order (Enter for 1-{XI_SIZE}): ").strip()
+        if not answer:
+            return squad
+        try:
+            squad.pick_xi(int(number) - 1 for number in answer.replace(",", " ").split())
+            return squad
+        except ValueError:
+            reporter.summary(XI_RULE)
+
+
+def display_batting(squads, team, reporter=None):
+    """Display a team's tournament batting figures."""
+    reporter = get_reporter(reporter)
+    if reporter.enabled(SUMMARY):
+        squad = squads.teams[team]
+        reporter.summary("\n--- {} Batting ---", team)
+        reporter.summary("{}", squads.stats.to_dataframe(squads.names(), squad.batting_order()))
+
+
+# Step 4: Innings
+# What an innings says depends on whether the user bats or bowls; {0} is the batting team.
+INNINGS_TEXT = {
+    True: {
+        "start": "\n--- Your Team is Batting ---",
+        "options": "\nOptions for batting simulation:",
+        "by_ball": "4. Play ball by ball",
+        "continue": "4. Continue batting",
+        "prompt": "Ball {}: Choose a number between 0 and 6: ",
+        "out": "You're out! Wickets left: {1}",
+        "chased": "\nYou chased the target in {1:.1f} overs with {2} wickets remaining!",
+        "over": "Innings over. Final score: {1}/{2} in {3:.1f} overs.",
+    },
+    False: {
+        "start": "\n--- {0}'s innings begins ---",
+        "options": "\nOptions for bowling simulation:",
+        "by_ball": "4. Bowl ball by ball",
+        "continue": "4. Continue bowling",
+        "prompt": "Ball {}: Guess a number between 0 and 6: ",
+        "out": "Computer is OUT! Wickets left: {1}",
+        "chased": "\n{0} chased the target in {1:.1f} overs with {2} wickets remaining!",
+        "over": "\n{0}'s innings is over. Final score: {1}/{2} in {3:.1f} overs.",
+    },
+}
+
+
+def choose_simulation(text, balls_left, reporter, continuing=False):
+    """Ask how many balls to simulate next; returns that number, or 0 to go ball by ball."""
+    while True:
+        if continuing:
+            reporter.match("\nOptions to continue:")
+            reporter.match("1. Simulate remaining innings")
+        else:
+            reporter.match(text["options"])
+            reporter.match("1. Simulate entire innings ({} overs)", balls_left // 6)
+        reporter.match("2. Simulate 5 overs")
+        reporter.match("3. Simulate 1 over")
+        reporter.match(text["continue"] if continuing else text["by_ball"])
 
-# Step 4: User Batting Innings
-def user_batting_innings(target_score=None):
-    """Simulate the user's batting innings."""
-    print("\n--- Your Team is Batting ---")
+        choice = (yield "Enter your choice (1/2/3/4): ").strip()
+        if choice == '1':
+            return balls_left
+        elif choice == '2' and balls_left >= 30:
+            return 30
+        elif choice == '3' and balls_left >= 6:
+            return 6
+        elif choice == '4':
+            return 0
+        elif continuing:
+            reporter.match("Invalid choice. Continuing ball by ball.")
+            return 0
+        reporter.match("Invalid choice or not enough balls remaining for this option. Please try again.")
+
+
+@timed("innings")
+def batting_innings(team_name, user_batting, target_score=None, rng=None, sink=None, match_id=0, innings=1,
+                    reporter=None, opponent=None, squads=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS,
+                    declare_at=None):
+    """Play one innings of `team_name`, batted by the user or bowled to by them.
+
+    The innings lasts at most `balls`, ends on `wickets`, and stops on reaching
+    `target_score` (a chase) or `declare_at` (a declaration). Returns
+    (runs, balls used, wickets lost).
+    """
+    rng = get_rng(rng)
+    reporter = get_reporter(reporter)
+    profiler = get_profiler()
+    text = INNINGS_TEXT[user_batting]
+    opponent = get_opponent(opponent)
+    computer = opponent.bowler if user_batting else opponent.batter
+    card = None
+    if squads is not None:  # Credit every ball to the batter on strike
+        sink = card = squads.card(squads.user_team if user_batting else team_name, sink)
+    stop_at = min(score for score in (target_score, declare_at) if score) if target_score or declare_at else None
+    reporter.match(text["start"], team_name)
     total_score = 0
     wickets_lost = 0  # Track wickets lost
-    balls = 120
     ball_count = 0
+    simulate_balls = None  # Balls to simulate next; 0 plays ball by ball, None asks
 
-    while ball_count < balls and wickets_lost < 10:
-        print("\nOptions for batting simulation:")
-        print("1. Simulate entire innings (20 overs)")
-        print("2. Simulate 5 overs")
-        print("3. Simulate 1 over")
-        print("4. Play ball by ball")
-
-        choice = input("Enter your choice (1/2/3/4): ").strip()
-
-        if choice == '1':
-            simulate_balls = balls - ball_count
-        elif choice == '2' and (balls - ball_count) >= 30:
-            simulate_balls = 30
-        elif choice == '3' and (balls - ball_count) >= 6:
-            simulate_balls = 6
-        elif choice == '4':
-            simulate_balls = 0
-        else:
-            print("Invalid choice or not enough balls remaining for this option. Please try again.")
-            continue
+    while ball_count < balls and wickets_lost < wickets and not (stop_at and total_score >= stop_at):
+        if simulate_balls is None:
+            simulate_balls = yield from choose_simulation(text, balls - ball_count, reporter)
 
         # Simulate innings
         if simulate_balls > 0:
-            for _ in range(simulate_balls):
-                if ball_count >= balls or wickets_lost == 10 or (target_score and total_score >= target_score):
-                    break
-                ball_count += 1
-                user_score = random.randint(0, 6)
-                comp_score = random.randint(0, 6)
-                if user_score == comp_score:
-                    wickets_lost += 1  # Increment wickets lost
-                else:
-                    total_score += user_score
-                if target_score and total_score >= target_score:
-                    print(f"\nYou chased the target in {ball_count / 6:.1f} overs with {10 - wickets_lost} wickets remaining!")
-                    return total_score, ball_count / 6
-            print(f"Final score: {total_score}/{wickets_lost} in {ball_count / 6:.1f} overs.")
-            return total_score, ball_count / 6
-        else:
-            # Play ball by ball
-            while ball_count < balls and wickets_lost < 10:
-                ball_count += 1
-                try:
-                    user_score = int(input(f"Ball {ball_count}: Choose a number between 0 and 6: "))
-                    if user_score < 0 or user_score > 6:
-                        print("Invalid choice. Please choose a number between 0 and 6.")
-                        ball_count -= 1
-                        continue
-                except ValueError:
-                    print("Invalid input. Please enter a number between 0 and 6.")
-                    ball_count -= 1
-                    continue
-
-                comp_score = random.randint(0, 6)
-                print(f"Computer chose {comp_score}")
-
-                if user_score == comp_score:
-                    wickets_lost += 1  # Increment wickets lost
-                    print(f"You're out! Wickets left: {10 - wickets_lost}")
-                else:
-                    total_score += user_score
-                print(f"Current score: {total_score}/{wickets_lost}")
-
-                if target_score and total_score >= target_score:
-                    print(f"\nYou chased the target in {ball_count / 6:.1f} overs with {10 - wickets_lost} wickets remaining!")
-                    return total_score, ball_count / 6
+            total_score, wickets_lost, ball_count = simulate_segment(
+                total_score, wickets_lost, ball_count, simulate_balls, stop_at, balls=balls, wickets=wickets,
+                rng=rng, sink=sink, match_id=match_id, innings=innings)
+            simulate_balls = None
+            if ball_count < balls and wickets_lost < wickets and not (stop_at and total_score >= stop_at):
+                reporter.match("After {:.1f} overs: {}/{}", ball_count / 6, total_score, wickets_lost)
+            continue
 
-    print(f"Innings over. Final score: {total_score}/{wickets_lost} in {ball_count / 6:.1f} overs.")
-    return total_score, ball_count / 6
+        # Play ball by ball
+        ball_count += 1
+        try:
+            pick = int((yield text["prompt"].format(ball_count)))
+            if pick < 0 or pick > MAX_PICK:
+                reporter.ball("Invalid choice. Please choose a number between 0 and 6.")
+                ball_count -= 1
+                continue
+        except ValueError:
+            reporter.ball("Invalid input. Please enter a number between 0 and 6.")
+            ball_count -= 1
+            continue
 
+        computer_pick = computer.pick(rng, batting=not user_batting)
+        computer.observe(pick)
+        reporter.ball("Computer chose {}", computer_pick)
+        bat, bowl = (pick, computer_pick) if user_batting else (computer_pick, pick)
+        if sink is not None:
+            sink.emit(match_id, innings, ball_count, bat, bowl)
+        profiler.count("balls")
+
+        if bat == bowl:
+            wickets_lost += 1  # Increment wickets lost
+            profiler.count("wickets")
+            reporter.ball(text["out"], team_name, wickets - wickets_lost)
+        else:
+            total_score += bat
+        reporter.ball("Current score: {}/{}", total_score, wickets_lost)
+        report_projection(reporter, "You" if user_batting else team_name, total_score, wickets_lost, ball_count,
+                          target_score, balls, wickets)
+
+        # Offer to simulate at the end of every over
+        if ball_count % 6 == 0 and ball_count < balls and wickets_lost < wickets \
+                and not (stop_at and total_score >= stop_at):
+            simulate_balls = yield from choose_simulation(text, balls - ball_count, reporter, continuing=True)
+
+    if target_score and total_score >= target_score:
+        reporter.match(text["chased"], team_name, ball_count / 6, wickets - wickets_lost)
+    else:
+        reporter.match(text["over"], team_name, total_score, wickets_lost, ball_count / 6)
+    show_card(card, squads, reporter)
+    return total_score, ball_count, wickets_lost
 
 
+def user_batting_innings(target_score=None, rng=None, sink=None, match_id=0, innings=1, reporter=None,
+                         opponent=None, squads=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS):
+    """Simulate the user's batting innings; returns (score, overs)."""
+    score, ball_count, _ = yield from batting_innings(
+        "You", True, target_score, rng, sink, match_id, innings, reporter,
+        opponent, squads, balls, wickets)
+    return score, ball_count / 6
 
 
 # Step 5: Computer Batting Innings
-def computer_batting_innings(team_name, target_score=None):
-    """Simulate the computer's batting innings with user-controlled bowling options."""
-    print(f"\n--- {team_name}'s innings begins ---")
-    total_score = 0
-    wickets_lost = 0  # Track wickets lost
-    balls = 120
-    ball_count = 0
+def computer_batting_innings(team_name, target_score=None, rng=None, sink=None, match_id=0, innings=1, reporter=None,
+                             opponent=None, squads=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS):
+    """Simulate the computer's batting innings with user-controlled bowling options; returns (score, overs)."""
+    score, ball_count, _ = yield from batting_innings(
+        team_name, False, target_score, rng, sink, match_id, innings, reporter, opponent, squads, balls, wickets)
+    return score, ball_count / 6
+
+
+def match_innings(match_format, user_team, reporter, **innings_options):
+    """Return the play_innings callback for a match the user plays: every innings is batted or bowled by them."""
+    played = []
+
+    def bat(team, target, balls, declare_at, number):
+        if target and match_format.innings == 1:
+            # Announce the chase the way the single-innings game always has
+            batted, runs, used, lost = played[-1]
+            if batted == user_team:
+                reporter.match("\nYour final score: {}/{} in {:.1f} overs. Target for opponent: {}.",
+                               runs, lost, used / 6, target)
+            else:
+                reporter.match("\nOpponent's final score: {}/{} in {:.1f} overs. Target for your team: {}.",
+                               runs, lost, used / 6, target)
+        elif match_format.innings > 1:
+            reporter.match("\n--- Innings {}: {} ---", number + 1, team)
+            if target:
+                reporter.match("{} need {} to win.", team, target)
+        runs, used, lost = yield from batting_innings(
+            team, team == user_team, target, innings=number + 1, reporter=reporter, balls=balls,
+            wickets=match_format.wickets, declare_at=declare_at, **innings_options)
+        played.append((team, runs, used, lost))
+        return runs, used, lost
 
-    while ball_count < balls and wickets_lost < 10:
-        print(f"\nOptions for bowling simulation:")
-        print("1. Simulate entire innings (20 overs)")
-        print("2. Simulate 5 overs")
-        print("3. Simulate 1 over")
-        print("4. Bowl ball by ball")
+    return bat
 
-        choice = input("Enter your choice (1/2/3/4): ").strip()
 
-        if choice == '1':
-            simulate_balls = balls - ball_count
-        elif choice == '2' and (balls - ball_count) >= 30:
-            simulate_balls = 30
-        elif choice == '3' and (balls - ball_count) >= 6:
-            simulate_balls = 6
-        elif choice == '4':
-            simulate_balls = 0
-        else:
-            print("Invalid choice or not enough balls remaining for this option. Please try again.")
-            continue
+def report_super_over(reporter, result, winner):
+    """Show who won the super over that settled a tied or drawn knockout."""
+    first, second = result.totals.values()
+    reporter.match("{} {} wins the super over.", "Scores level!" if first == second else "Match drawn!", winner)
 
-        # Simulate innings
-        if simulate_balls > 0:
-            for _ in range(simulate_balls):
-                if ball_count >= balls or wickets_lost == 10 or (target_score and total_score >= target_score):
-                    break
-                ball_count += 1
-                computer_score = random.randint(0, 6)
-                user_guess = random.randint(0, 6)  # Simulated user guess
-                if computer_score == user_guess:
-                    wickets_lost += 1  # Increment wickets lost
-                else:
-                    total_score += computer_score
-                if target_score and total_score >= target_score:
-                    print(f"\n{team_name} chased the target in {ball_count / 6:.1f} overs with {10 - wickets_lost} wickets remaining!")
-                    return total_score, ball_count / 6
-            print(f"After {ball_count / 6:.1f} overs: {total_score}/{wickets_lost}")
-        else:
-            # Bowl ball by ball
-            while ball_count < balls and wickets_lost < 10:
-                ball_count += 1
-                try:
-                    user_guess = int(input(f"Ball {ball_count}: Guess a number between 0 and 6: "))
-                    if user_guess < 0 or user_guess > 6:
-                        print("Invalid choice. Please choose a number between 0 and 6.")
-                        ball_count -= 1
-                        continue
-                except ValueError:
-                    print("Invalid input. Please enter a number between 0 and 6.")
-                    ball_count -= 1
-                    continue
-
-                computer_score = random.randint(0, 6)
-                print(f"Computer chose {computer_score}")
-
-                if computer_score == user_guess:
-                    wickets_lost += 1  # Increment wickets lost
-                    print(f"Computer is OUT! Wickets left: {10 - wickets_lost}")
-                else:
-                    total_score += computer_score
-                print(f"Current score: {total_score}/{wickets_lost}")
-
-                if target_score and total_score >= target_score:
-                    print(f"\n{team_name} chased the target in {ball_count / 6:.1f} overs with {10 - wickets_lost} wickets remaining!")
-                    return total_score, ball_count / 6
-
-                # Offer to simulate at specific intervals
-                if ball_count % 6 == 0 and wickets_lost < 10:
-                    print("\nOptions to continue:")
-                    print("1. Simulate remaining innings")
-                    print("2. Simulate 5 overs")
-                    print("3. Simulate 1 over")
-                    print("4. Continue bowling")
-                    interval_choice = input("Enter your choice (1/2/3/4): ").strip()
-                    if interval_choice == '1':
-                        simulate_balls = balls - ball_count
-                        break
-                    elif interval_choice == '2' and (balls - ball_count) >= 30:
-                        simulate_balls = 30
-                        break
-                    elif interval_choice == '3' and (balls - ball_count) >= 6:
-                        simulate_balls = 6
-                        break
-                    elif interval_choice == '4':
-                        continue
-                    else:
-                        print("Invalid choice. Continuing ball by ball.")
-                        continue
-
-    print(f"\n{team_name}'s innings is over. Final score: {total_score}/{wickets_lost} in {ball_count / 6:.1f} overs.")
-    return total_score, ball_count / 6
 
+def report_innings(reporter, result, lead="\n"):
+    """Show every innings of a simulated match, one line each."""
+    for i, (team, runs, balls, wickets) in enumerate(result.innings):
+        reporter.match("{}{} scored: {}/{} in {:.1f} overs.", lead if i == 0 else "", team, runs, wickets, balls / 6)
 
 
 
@@ -319,70 +388,66 @@ def computer_batting_innings(team_name, target_score=None):
 
 
 # Step 6: Toss and Match Logic (User and Computer Integration)
-def toss_and_match_logic_with_tables(match, user_team, group_a_table, group_b_table):
+@timed("group match")
+def toss_and_match_logic_with_tables(match, user_team, group_a_table, group_b_table, rng=None, sink=None, match_id=0,
+                                     reporter=None, opponent=None, squads=None, match_format=T20):
     """Simulate toss, play the match, and update group tables."""
-    print(f"\n--- Match: {match[0]} vs {match[1]} ---")
-    group_table = group_a_table if match[0] in group_a_table.index else group_b_table
+    rng = get_rng(rng)
+    reporter = get_reporter(reporter)
+    reporter.match("\n--- Match: {} vs {} ---", match[0], match[1])
+    group_table = group_a_table if match[0] in group_a_table else group_b_table
 
     user_batting_first = None
 
     if user_team in match:
-        print("\n--- Toss ---")
+        reporter.match("\n--- Toss ---")
         while True:
-            user_toss_call = input(f"Choose heads or tails for the toss: ").strip().lower()
+            user_toss_call = (yield "Choose heads or tails for the toss: ").strip().lower()
             if user_toss_call in ["heads", "tails"]:
                 break
-            print("Invalid input. Please choose 'heads' or 'tails'.")
-        toss_result = random.choice(["heads", "tails"])
-        print(f"The toss result is: {toss_result.capitalize()}")
+            reporter.match("Invalid input. Please choose 'heads' or 'tails'.")
+        toss_result = rng.choice(["heads", "tails"])
+        reporter.match("The toss result is: {}", toss_result.capitalize())
 
         if user_toss_call == toss_result:
-            print("You won the toss!")
+            reporter.match("You won the toss!")
             while True:
-                toss_decision = input("Do you want to bat or bowl? (Enter 'bat' or 'bowl'): ").strip().lower()
+                toss_decision = (yield "Do you want to bat or bowl? (Enter 'bat' or 'bowl'): ").strip().lower()
                 if toss_decision in ["bat", "bowl"]:
                     user_batting_first = toss_decision == "bat"
                     break
-                print("Invalid input. Please type 'bat' or 'bowl'.")
+                reporter.match("Invalid input. Please type 'bat' or 'bowl'.")
         else:
-            print("You lost the toss.")
-            computer_choice = random.choice(["bat", "bowl"])
-            print(f"The opponent chose to {computer_choice} first.")
+            reporter.match("You lost the toss.")
+            computer_choice = rng.choice(["bat", "bowl"])
+            reporter.match("The opponent chose to {} first.", computer_choice)
             user_batting_first = computer_choice == "bowl"
 
-        # Simulate the match based on toss results
-        if user_batting_first:
-            print("\nYou are batting first.")
-            user_score, user_overs = user_batting_innings()
-            target = user_score + 1
-            print(f"\nYour final score: {user_score}/{10} in {user_overs:.1f} overs. Target for opponent: {target}.")
-            comp_score, comp_overs = computer_batting_innings(match[1], target)
-        else:
-            print("\nYou are bowling first.")
-            comp_score, comp_overs = computer_batting_innings(match[0])
-            target = comp_score + 1
-            print(f"\nOpponent's final score: {comp_score}/{10} in {comp_overs:.1f} overs. Target for your team: {target}.")
-            user_score, user_overs = user_batting_innings(target_score=target)
-
-        # Update the group table
-        group_table = update_group_table(group_table, match[0], match[1], user_score, comp_score, user_overs, comp_overs)
+        # Play the match based on toss results
+        other = match[1] if match[0] == user_team else match[0]
+        first, second = (user_team, other) if user_batting_first else (other, user_team)
+        reporter.match("\nYou are batting first." if user_batting_first else "\nYou are bowling first.")
+        bat = match_innings(match_format, user_team, reporter, rng=rng, sink=sink, match_id=match_id,
+                            opponent=opponent, squads=squads)
+        result = yield from play_innings(match_format, first, second, bat, reporter)
     else:
-        # Simulate computer vs computer match
-        print("\nSimulating the match...")
-        team1_score = random.randint(100, 200)
-        team2_score = random.randint(100, 200)
-        team1_wickets = random.randint(0, 10)
-        team2_wickets = random.randint(0, 10)
-
-        print(f"\n{match[0]} scored: {team1_score}/{team1_wickets} in 20 overs.")
-        print(f"{match[1]} scored: {team2_score}/{team2_wickets} in 20 overs.")
+        # Simulate computer vs computer match; the first team bats first
+        reporter.match("\nSimulating the match...")
+        result = simulate_match(match_format, rng, match[0], match[1])
+        report_innings(reporter, result)
+    if match_format.innings > 1:
+        if result.drawn:
+            reporter.match("Match drawn.")
+        else:
+            reporter.match("{} win.", result.winner)
 
-        # Update tables
-        group_table = update_group_table(group_table, match[0], match[1], team1_score, team2_score, 20, 20)
+    # Update the group table
+    update_group_table(group_table, match[0], match[1], result.totals[match[0]], result.totals[match[1]],
+                       result.faced[match[0]] / 6, result.faced[match[1]] / 6, result.drawn)
 
     # Display updated group table
     group_name = "Group A" if group_table is group_a_table else "Group B"
-    display_group_table(group_name, group_table)
+    display_group_table(group_name, group_table, reporter)
 
 
 
@@ -393,23 +458,16 @@ def toss_and_match_logic_with_tables(match, user_team, group_a_table, group_b_ta
 
 
 # Step 7: Determine Semifinalists
-def determine_semifinalists(group_a_table, group_b_table):
+def determine_semifinalists(group_a_table, group_b_table, reporter=None):
     """Determine the top 2 teams from each group for the semifinals."""
-    print("\n--- Determining Semifinalists ---")
-
-    # Sort Group Tables by Points and Net Run Rate
-    group_a_table = reorder_group_table(group_a_table)
-    group_b_table = reorder_group_table(group_b_table)
-
-    # Top 2 Teams from Group A and Group B
-    group_a_teams = group_a_table.index.tolist()
-    group_b_teams = group_b_table.index.tolist()
+    reporter = get_reporter(reporter)
+    reporter.summary("\n--- Determining Semifinalists ---")
 
-    # Semifinalists
-    team1, team2 = group_a_teams[:2]
-    team3, team4 = group_b_teams[:2]
+    # Top 2 Teams from Group A and Group B by Points, Wins and Net Run Rate
+    team1, team2 = group_a_table.top(2)
+    team3, team4 = group_b_table.top(2)
 
-    print(f"Semifinalists: Team 1 ({team1}), Team 2 ({team2}), Team 3 ({team3}), Team 4 ({team4})")
+    reporter.summary("Semifinalists: Team 1 ({}), Team 2 ({}), Team 3 ({}), Team 4 ({})", team1, team2, team3, team4)
     return team1, team2, team3, team4
 
 
@@ -420,93 +478,106 @@ def determine_semifinalists(group_a_table, group_b_table):
 
 
 # Step 8: Play Match (User or Simulated)
-def play_match(team1, team2, user_team):
+@timed("knockout match")
+def play_match(team1, team2, user_team, rng=None, sink=None, match_id=0, reporter=None, opponent=None, squads=None,
+               match_format=T20):
     """Simulate or play a match depending on whether the user is involved."""
-    print(f"\n--- Match: {team1} vs {team2} ---")
+    rng = get_rng(rng)
+    reporter = get_reporter(reporter)
+    reporter.match("\n--- Match: {} vs {} ---", team1, team2)
 
     if user_team in [team1, team2]:
-        print("\n--- Toss ---")
+        reporter.match("\n--- Toss ---")
         while True:
-            user_toss_call = input(f"Choose heads or tails for the toss: ").strip().lower()
+            user_toss_call = (yield "Choose heads or tails for the toss: ").strip().lower()
             if user_toss_call in ["heads", "tails"]:
                 break
-            print("Invalid input. Please choose 'heads' or 'tails'.")
-        toss_result = random.choice(["heads", "tails"])
-        print(f"The toss result is: {toss_result.capitalize()}")
+            reporter.match("Invalid input. Please choose 'heads' or 'tails'.")
+        toss_result = rng.choice(["heads", "tails"])
+        reporter.match("The toss result is: {}", toss_result.capitalize())
 
         if user_toss_call == toss_result:
-            print("You won the toss!")
+            reporter.match("You won the toss!")
             while True:
-                toss_decision = input("Do you want to bat or bowl? (Enter 'bat' or 'bowl'): ").strip().lower()
+                toss_decision = (yield "Do you want to bat or bowl? (Enter 'bat' or 'bowl'): ").strip().lower()
                 if toss_decision in ["bat", "bowl"]:
                     user_batting_first = toss_decision == "bat"
                     break
-                print("Invalid input. Please type 'bat' or 'bowl'.")
+                reporter.match("Invalid input. Please type 'bat' or 'bowl'.")
         else:
-            print("You lost the toss.")
-            user_batting_first = random.choice([True, False])
-            print(f"The opponent chose to {'bat' if user_batting_first else 'bowl'} first.")
-
-        # Simulate innings based on toss decision
-        if user_team == team1:
-            if user_batting_first:
-                user_score, user_overs = user_batting_innings()
-                comp_score, comp_overs = computer_batting_innings(team2, user_score + 1)
-            else:
-                comp_score, comp_overs = computer_batting_innings(team1)
-                user_score, user_overs = user_batting_innings(target_score=comp_score + 1)
-        else:
-            if user_batting_first:
-                user_score, user_overs = user_batting_innings()
-                comp_score, comp_overs = computer_batting_innings(team1, user_score + 1)
-            else:
-                comp_score, comp_overs = computer_batting_innings(team2)
-                user_score, user_overs = user_batting_innings(target_score=comp_score + 1)
-
-        # Determine winner
-        if user_score > comp_score:
-            print(f"\nYour team ({user_team}) wins!")
-            return user_team
+            reporter.match("You lost the toss.")
+            user_batting_first = rng.choice([True, False])
+            reporter.match("The opponent chose to {} first.", 'bat' if user_batting_first else 'bowl')
+
+        # Play innings based on toss decision
+        other = team2 if user_team == team1 else team1
+        first, second = (user_team, other) if user_batting_first else (other, user_team)
+        bat = match_innings(match_format, user_team, reporter, rng=rng, sink=sink, match_id=match_id,
+                            opponent=opponent, squads=squads)
+        result = yield from play_innings(match_format, first, second, bat, reporter)
+
+        # Determine winner; a tie or draw goes to a super over
+        winner = result.winner
+        if winner is None:
+            winner = second if get_model().super_over(rng) else first
+            report_super_over(reporter, result, winner)
+        if winner == user_team:
+            reporter.match("\nYour team ({}) wins!", user_team)
         else:
-            print(f"\n{team2 if user_team == team1 else team1} wins!")
-            return team2 if user_team == team1 else team1
+            reporter.match("\n{} wins!", winner)
+        return winner
     else:
-        # Simulate match
-        team1_score = random.randint(0, 200)
-        team2_score = random.randint(0, 200)
-
-        print(f"{team1} scored: {team1_score}")
-        print(f"{team2} scored: {team2_score}")
-
-        if team1_score > team2_score:
-            print(f"{team1} wins!")
-            return team1
-        else:
-            print(f"{team2} wins!")
-            return team2
+        # Simulate match; the first team bats first and a tie goes to a super over
+        result, winner = simulate_knockout(match_format, rng, team1, team2)
+        report_innings(reporter, result, lead="")
+        if result.drawn:
+            report_super_over(reporter, result, winner)
+        reporter.match("{} wins!", winner)
+        return winner
 
 
 
 # Step 9: Play Semifinals and Final
-def play_semifinals_and_final(team1, team2, team3, team4, user_team):
-    """Play the semifinals and final to determine the champion."""
+def play_semifinals_and_final(team1, team2, team3, team4, user_team, rng=None, sink=None, first_match_id=0,
+                              reporter=None, results=(), on_result=None, opponent=None, squads=None,
+                              match_format=T20):
+    """Play the semifinals and final to determine the champion.
+
+    `results` holds the winners of knockout matches already played (when resuming);
+    on_result(winners) is called after each new match.
+    """
+    rng = get_rng(rng)
+    reporter = get_reporter(reporter)
     # Semifinal Matches
     semifinalists = [
         (team1, team4),  # Team 1 vs Team 4
         (team2, team3),  # Team 2 vs Team 3
     ]
 
-    print("\n--- Playing Semifinals ---")
-    winners = []
-    for match in semifinalists:
-        winner = play_match(match[0], match[1], user_team)
+    reporter.summary("\n--- Playing Semifinals ---")
+    winners = list(results)
+    for i in range(len(winners), 2):
+        match = semifinalists[i]
+        winner = yield from play_match(match[0], match[1], user_team, rng=rng.stream(i), sink=sink,
+                                       match_id=first_match_id + i, reporter=reporter, opponent=opponent,
+                                       squads=squads, match_format=match_format)
         winners.append(winner)
+        if on_result is not None:
+            on_result(winners)
 
     # Final Match
-    print("\n--- Final Match ---")
-    champion = play_match(winners[0], winners[1], user_team)
-
-    print(f"\n--- Champion: {champion} ---")
+    reporter.summary("\n--- Final Match ---")
+    if len(winners) == 3:
+        champion = winners[2]
+    else:
+        champion = yield from play_match(winners[0], winners[1], user_team, rng=rng.stream(2), sink=sink,
+                                         match_id=first_match_id + 2, reporter=reporter, opponent=opponent,
+                                         squads=squads, match_format=match_format)
+        winners.append(champion)
+        if on_result is not None:
+            on_result(winners)
+
+    reporter.summary("\n--- Champion: {} ---", champion)
     return champion
 
 
@@ -516,41 +587,145 @@ def play_semifinals_and_final(team1, team2, team3, team4, user_team):
 
 
 # Main Game Logic
-group_a, group_b, user_team = setup_teams_and_groups()  # Setup teams and groups
-group_a_table = initialize_group_table(group_a)  # Initialize Group A table
-group_b_table = initialize_group_table(group_b)  # Initialize Group B table
-full_schedule = generate_full_schedule(group_a, group_b)  # Create full schedule
-display_schedule(full_schedule)  # Display match schedule
-
-# Play group stage matches
-match_counter = 0
-for match in full_schedule:
-    print(f"\n--- Playing Match {match_counter + 1}: {match[0]} vs {match[1]} ---")
-    toss_and_match_logic_with_tables(match, user_team, group_a_table, group_b_table)
-    match_counter += 1
-
-    # Display updated tables every two matches
-    if match_counter % 2 == 0:
-        print("\n--- Group Tables After Every Two Matches ---")
-        print("\n--- Group A Table ---")
-        display_group_table("Group A", group_a_table)
-        print("\n--- Group B Table ---")
-        display_group_table("Group B", group_b_table)
-
-
-# Final Group Tables
-print("\n--- Final Group Tables ---")
-display_group_table("Group A", group_a_table)
-display_group_table("Group B", group_b_table)
-
-# Determine Semifinalists
-team1, team2, team3, team4 = determine_semifinalists(group_a_table, group_b_table)
-
-# Play Semifinals and Final
-champion = play_semifinals_and_final(team1, team2, team3, team4, user_team)
-
-# End of Tournament
-print(f"\n--- Tournament Champion: {champion} ---")
+def tournament(rng, reporter, sink=None, checkpoint=None, difficulty="easy", squad=False, match_format=T20):
+    """Play the whole tournament as a generator of prompts; returns the champion.
+
+    With a `checkpoint` path the state is saved after every match, and a tournament
+    left unfinished there is resumed instead of starting a new one. The computer
+    opponent plays at `difficulty` and learns the user's habits over the tournament.
+    With `squad` the user names a squad and picks an XI, and every innings the
+    user plays is scored batter by batter. Every match is played in `match_format`,
+    except that a resumed tournament keeps the format it was saved in.
+    """
+    opponent = Opponent(difficulty)
+    state = load_tournament(checkpoint) if checkpoint and os.path.exists(checkpoint) else None
+    if state is None:
+        group_a, group_b, user_team = yield from setup_teams_and_groups(rng, reporter)  # Setup teams and groups
+        group_a_table = initialize_group_table(group_a)  # Initialize Group A table
+        group_b_table = initialize_group_table(group_b)  # Initialize Group B table
+        state = TournamentState(rng, [group_a, group_b], user_team, [group_a_table, group_b_table], 0,
+                                match_format=match_format.name.lower())
+    else:
+        rng, (group_a, group_b), user_team = state.rng, state.groups, state.user_team
+        group_a_table, group_b_table = state.tables
+        reporter.summary("Resuming the tournament after {} matches.", state.played + len(state.knockout))
+        if MATCH_FORMATS[state.match_format] is not match_format:  # One points table never mixes formats
+            match_format = MATCH_FORMATS[state.match_format]
+            reporter.summary("The tournament was saved with {} matches and carries on with them.", match_format.name)
+    squads = None
+    if squad and user_team != "computer":
+        squads = Squads(group_a + group_b, user_team)
+        yield from pick_squad(squads.teams[user_team], reporter)
+    full_schedule = generate_full_schedule(group_a, group_b)  # Create full schedule
+    display_schedule(full_schedule, reporter)  # Display match schedule
+
+    def save(knockout=()):
+        if checkpoint:
+            state.knockout = list(knockout)
+            save_tournament(checkpoint, state)
+
+    # Play group stage matches
+    match_counter = state.played
+    for match in full_schedule[match_counter:]:
+        reporter.match("\n--- Playing Match {}: {} vs {} ---", match_counter + 1, match[0], match[1])
+        yield from toss_and_match_logic_with_tables(match, user_team, group_a_table, group_b_table,
+                                                    rng=rng.stream(1, match_counter), sink=sink,
+                                                    match_id=match_counter, reporter=reporter, opponent=opponent,
+                                                    squads=squads, match_format=match_format)
+        match_counter += 1
+        state.played = match_counter
+        save()
+
+        # Display updated tables every two matches
+        if match_counter % 2 == 0:
+            reporter.match("\n--- Group Tables After Every Two Matches ---")
+            reporter.match("\n--- Group A Table ---")
+            display_group_table("Group A", group_a_table, reporter)
+            reporter.match("\n--- Group B Table ---")
+            display_group_table("Group B", group_b_table, reporter)
+
+    # Final Group Tables
+    reporter.summary("\n--- Final Group Tables ---")
+    display_group_table("Group A", group_a_table, reporter, SUMMARY)
+    display_group_table("Group B", group_b_table, reporter, SUMMARY)
+
+    # Determine Semifinalists
+    team1, team2, team3, team4 = determine_semifinalists(group_a_table, group_b_table, reporter)
+
+    # Play Semifinals and Final
+    champion = yield from play_semifinals_and_final(team1, team2, team3, team4, user_team, rng=rng.stream(2),
+                                                    sink=sink, first_match_id=match_counter, reporter=reporter,
+                                                    results=state.knockout, on_result=save, opponent=opponent,
+                                                    squads=squads, match_format=match_format)
+    if checkpoint:
+        os.remove(checkpoint)  # Finished, so the next run starts a new tournament
+
+    # End of Tournament
+    if squads is not None:
+        display_batting(squads, user_team, reporter)
+    reporter.summary("\n--- Tournament Champion: {} ---", champion)
+    return champion
+
+
+def play(steps, ask=None):
+    """Drive a game generator, answering each prompt with ask(prompt) (input() by default); returns its result."""
+    ask = ask or input
+    profiler = get_profiler()
+    try:
+        prompt = next(steps)
+        while True:
+            with profiler.span("prompt"):
+                answer = ask(prompt)
+            prompt = steps.send(answer)
+    except StopIteration as stop:
+        return stop.value
+
+
+def main(seed=None, backend="pcg64", events_path=None, verbosity="ball", checkpoint=None, difficulty="easy",
+         squad=False, match_format="t20"):
+    """Run the interactive tournament on the console."""
+    reporter = Reporter(verbosity)
+    sink = EventLog(events_path) if events_path else None  # Ball-by-ball log of every innings
+    rng = GameRNG(seed, backend)  # Every match gets its own stream of this seed, so it can be replayed
+    try:
+        return play(tournament(rng, reporter, sink, checkpoint, difficulty, squad, MATCH_FORMATS[match_format]))
+    finally:
+        if sink is not None:
+            sink.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play the T20 World Cup head and tails game.")
+    parser.add_argument("--seed", type=int, default=None, help="seed for a reproducible tournament")
+    parser.add_argument("--rng", choices=["pcg64", "philox"], default="pcg64", help="random number backend")
+    parser.add_argument("--events", default=None, help="append every ball to this event log (.parquet needs pyarrow)")
+    parser.add_argument("--verbosity", choices=list(LEVELS), default="ball",
+                        help="how much to print: silent, summary, match or ball (default)")
+    parser.add_argument("--outcome-cache", default=None, metavar="PATH",
+                        help="draw simulated innings from exact outcome tables cached in this SQLite file")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH",
+                        help="save the tournament here after every match and resume it from here")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), default="easy",
+                        help="computer opponent: easy picks at random, medium and hard learn your habits")
+    parser.add_argument("--match-format", choices=list(MATCH_FORMATS), default="t20",
+                        help="play T20 (default), ODI or two-innings Test matches")
+    parser.add_argument("--squad", action="store_true",
+                        help="name a 15-player squad, pick your XI and get batting figures for every player")
+    parser.add_argument("--projection", default=None, metavar="PATH",
+                        help="memory-map the live projection table from this .npy file, building it there if missing")
+    parser.add_argument("--profile", nargs="?", const="1", default=None, metavar="TRACE.json",
+                        help="print per-phase timings at the end (and write a Chrome trace to TRACE.json); "
+                             "HTG_PROFILE does the same")
+    args = parser.parse_args()
+    enable_profiling(args.profile)
+    if args.outcome_cache:
+        use_cache(enable_outcome_cache(CACHE_SIZE, args.outcome_cache))
+    if args.projection:
+        use_projection(args.projection)
+    main(seed=args.seed, backend=args.rng, events_path=args.events, verbosity=args.verbosity,
+         checkpoint=args.checkpoint, difficulty=args.difficulty,
+         squad=args.squad, match_format=args.match_format)
+    finish_profiling()
 
 
 
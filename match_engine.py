@@ -0,0 +1,158 @@
+from innings_engine import BALLS_PER_INNINGS, MAX_PICK, WICKETS_PER_INNINGS, simulate_segment
+from match_model import get_model
+from reporting import SILENT, Reporter
+
+
+# Match formats over one innings engine. A format sets the balls per innings
+# (None for no limit) and how many innings each side bats; two-innings matches
+# also have a time limit in balls, a follow-on margin and a lead at which the
+# side batting third declares. play_innings applies those rules for every
+# format; the innings themselves come from a `bat` generator, so the interactive
+# game and the simulators share the rules and differ only in who picks the numbers.
+QUIET = Reporter(SILENT)
+
+
+class MatchFormat:
+    """Balls per innings, innings per side and, for two-innings matches, time, follow-on and declarations."""
+
+    __slots__ = ("name", "balls", "wickets", "innings", "match_balls", "follow_on", "declare_lead")
+
+    def __init__(self, name, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, innings=1, match_balls=None,
+                 follow_on=None, declare_lead=None):
+        self.name = name
+        self.balls = balls  # None: an innings lasts until all out, a declaration or the end of the match
+        self.wickets = wickets
+        self.innings = innings  # Per side
+        self.match_balls = match_balls  # Time limit for the whole match; None for limited-overs matches
+        self.follow_on = follow_on  # First-innings lead that lets the side batting first make the other bat again
+        self.declare_lead = declare_lead  # Lead at which the side batting third declares
+
+
+T20 = MatchFormat("T20", balls=120)
+ODI = MatchFormat("ODI", balls=300)
+TEST = MatchFormat("Test", balls=None, innings=2, match_balls=5 * 90 * 6, follow_on=200, declare_lead=300)
+MATCH_FORMATS = {"t20": T20, "odi": ODI, "test": TEST}
+
+
+class MatchResult:
+    """The innings of a finished match and its winner (None for a tie or a draw)."""
+
+    __slots__ = ("innings", "winner", "totals", "faced")
+
+    def __init__(self, innings, winner, totals, faced):
+        self.innings = innings  # (team, runs, balls, wickets) in the order they were batted
+        self.winner = winner
+        self.totals = totals  # Team -> runs over all its innings
+        self.faced = faced  # Team -> balls faced over all its innings
+
+    @property
+    def drawn(self):
+        """Return True if neither side won."""
+        return self.winner is None
+
+
+def play_innings(fmt, first, second, bat, reporter=None):
+    """Play the innings of a match in `fmt` between `first` (batting first) and `second`; returns a MatchResult.
+
+    bat(team, target, balls, declare_at, number) is a generator returning
+    (runs, balls used, wickets lost) for the innings `number` (0-based) of
+    `team`: a chase stops on reaching `target`, a declaration on reaching
+    `declare_at`, and the innings can last at most `balls`.
+    """
+    reporter = reporter or QUIET
+    totals, faced = {first: 0, second: 0}, {first: 0, second: 0}
+    innings = []
+    balls_left = fmt.match_balls
+    last = 2 * fmt.innings - 1
+    batting, decided = first, fmt.match_balls is None
+    for number in range(last + 1):
+        other = second if batting == first else first
+        limit = fmt.balls if balls_left is None else min(fmt.balls or balls_left, balls_left)
+        if limit <= 0:
+            reporter.match("\nOut of time: the match is drawn.")
+            break
+        lead = totals[batting] - totals[other]
+        target = 1 - lead if number == last else None
+        declare_at = None
+        if fmt.declare_lead and number == last - 1:
+            declare_at = max(fmt.declare_lead - lead, 1)
+        runs, used, lost = yield from bat(batting, target, limit, declare_at, number)
+        innings.append((batting, runs, used, lost))
+        totals[batting] += runs
+        faced[batting] += used
+        if balls_left is not None:
+            balls_left -= used
+        if declare_at and runs >= declare_at and lost < fmt.wickets:
+            reporter.match("\n{} declared at {}/{}, {} runs ahead.", batting, runs, lost, totals[batting] - totals[other])
+
+        if number == last:
+            decided = decided or lost >= fmt.wickets or runs >= target
+            break
+        if number == last - 1 and fmt.innings > 1 and lost >= fmt.wickets and totals[batting] < totals[other]:
+            reporter.match("\n{} win by an innings.", other)  # The side that batted twice is still behind
+            decided = True
+            break
+        if number == 1 and fmt.follow_on and totals[first] - totals[second] >= fmt.follow_on:
+            reporter.match("\n{} lead by {} and enforce the follow-on.", first, totals[first] - totals[second])
+            continue  # The side batting second goes straight back in
+        batting = other
+
+    winner = None
+    if decided and totals[first] != totals[second]:
+        winner = first if totals[first] > totals[second] else second
+    return MatchResult(innings, winner, totals, faced)
+
+
+def _finished(value):
+    """Return a generator that asks for nothing and returns `value`."""
+    return value
+    yield  # Unreachable; makes this a generator function
+
+
+def simulated_batting(rng, fmt, model=None, squads=None):
+    """Return a play_innings `bat` callback that simulates every innings.
+
+    Limited-overs innings are drawn from the MatchModel's exact outcome tables;
+    the rest (Test innings, cut short by the time left) are simulated ball by ball.
+    With `squads` every innings is also credited to the batters of its side.
+    """
+    model = get_model(model)
+
+    def bat(team, target, balls, declare_at, number):
+        stop = min(score for score in (target, declare_at) if score) if target or declare_at else None
+        if fmt.balls is not None and balls == fmt.balls:
+            runs, used, lost = model.innings(rng, stop, balls, fmt.wickets)
+            max_pick = model.max_pick
+        else:
+            runs, lost, used = simulate_segment(0, 0, 0, balls, stop, balls=balls, wickets=fmt.wickets, rng=rng)
+            max_pick = MAX_PICK
+        if squads is not None:
+            squads.record_drawn(team, runs, used, lost, fmt.wickets, stop, max_pick)
+        return _finished((runs, used, lost))
+
+    return bat
+
+
+def run(steps):
+    """Run a match generator that needs no input to the end and return its result."""
+    try:
+        next(steps)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("A simulated match asked for input.")
+
+
+def simulate_match(fmt, rng, first="first", second="second", model=None, reporter=None, squads=None):
+    """Simulate a whole match between two computer sides and return its MatchResult; `squads` get the batting."""
+    return run(play_innings(fmt, first, second, simulated_batting(rng, fmt, model, squads), reporter))
+
+
+def simulate_knockout(fmt, rng, first="first", second="second", model=None, reporter=None, squads=None):
+    """Simulate a match that needs a winner; a tie or draw goes to super overs. Returns (MatchResult, winner).
+
+    Super overs are not credited to `squads`.
+    """
+    result = simulate_match(fmt, rng, first, second, model, reporter, squads)
+    if result.winner is not None:
+        return result, result.winner
+    return result, second if get_model(model).super_over(rng) else first
@@ -0,0 +1,102 @@
+import numpy as np
+
+from innings_dp import score_distribution
+from innings_engine import BALLS_PER_INNINGS, MAX_PICK, WICKETS_PER_INNINGS
+from outcome_cache import OutcomeCache, TableStore
+from profiling import get_profiler
+
+
+# Computer-vs-computer matches drawn from the exact innings distributions of the
+# ball-by-ball model instead of being simulated ball by ball. The first innings and
+# the chase of each possible target get their own outcome table, built once and
+# kept in an OutcomeCache, so a match costs two O(1) table draws. Chases stop at
+# the target exactly as a simulated chase does; tied knockouts go to super overs.
+CACHE_SIZE = 512  # Enough tables for every chase target that turns up in practice
+SUPER_OVER_BALLS = 6
+SUPER_OVER_WICKETS = 2
+
+
+class MatchModel:
+    """Draws whole matches between computer teams from cached outcome tables."""
+
+    __slots__ = ("cache", "balls", "wickets", "max_pick")
+
+    def __init__(self, cache=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, max_pick=MAX_PICK):
+        self.cache = OutcomeCache(CACHE_SIZE) if cache is None else cache
+        self.balls = balls
+        self.wickets = wickets
+        self.max_pick = max_pick
+
+    def precompute(self, min_prob=1e-9):
+        """Build the first-innings and super-over tables and the chase table of every first score above `min_prob`."""
+        for balls, wickets, target in self.table_keys(min_prob):
+            self.cache.get(balls, wickets, target, self.max_pick)
+        return self
+
+    def table_keys(self, min_prob=1e-9):
+        """Return (balls, wickets, target) for precompute's tables and every super-over table."""
+        keys = []
+        for balls, wickets in ((self.balls, self.wickets), (SUPER_OVER_BALLS, SUPER_OVER_WICKETS)):
+            scores = score_distribution(balls=balls, wickets=wickets, max_pick=self.max_pick)
+            keys.append((balls, wickets, None))
+            keys += [(balls, wickets, score + 1) for score in np.nonzero(scores > min_prob)[0].tolist()]
+        return keys
+
+    def share(self, path, min_prob=1e-9):
+        """Build the table_keys tables into a TableStore at `path` for other processes to memory-map.
+
+        Tables already in this model's cache (or its on-disk tier) are reused.
+        """
+        TableStore.save(path, (((self.max_pick, balls, wickets, target),
+                                self.cache.get(balls, wickets, target, self.max_pick))
+                               for balls, wickets, target in self.table_keys(min_prob)))
+
+    def innings(self, rng, target=None, balls=None, wickets=None):
+        """Draw one innings as (runs, balls used, wickets lost); a chase ends on reaching `target`."""
+        table = self.cache.get(balls or self.balls, wickets or self.wickets, target, self.max_pick)
+        runs, used, lost = outcome = table.draw(rng)
+        profiler = get_profiler()
+        if profiler.enabled:
+            profiler.count("balls", used)
+            profiler.count("wickets", lost)
+        return outcome
+
+    def match(self, rng):
+        """Draw (first innings, second innings); the second chases the first score plus one."""
+        first = self.innings(rng)
+        return first, self.innings(rng, first[0] + 1)
+
+    def super_over(self, rng):
+        """Play super overs until one side wins; return True if the side that batted second in the match wins."""
+        while True:
+            # The team that batted second in the match bats first in the super over
+            first = self.innings(rng, balls=SUPER_OVER_BALLS, wickets=SUPER_OVER_WICKETS)
+            second = self.innings(rng, first[0] + 1, SUPER_OVER_BALLS, SUPER_OVER_WICKETS)
+            if first[0] != second[0]:
+                return first[0] > second[0]
+
+    def knockout(self, rng):
+        """Draw a match that needs a winner; return (first innings, second innings, True if the chasing side won)."""
+        first, second = self.match(rng)
+        if first[0] == second[0]:
+            return first, second, self.super_over(rng)
+        return first, second, second[0] > first[0]
+
+
+_default_model = None
+
+
+def get_model(model=None):
+    """Return `model`, or a shared MatchModel created on first use."""
+    global _default_model
+    if model is not None:
+        return model
+    if _default_model is None:
+        _default_model = MatchModel()
+    return _default_model
+
+
+def use_cache(cache):
+    """Make the shared MatchModel draw from `cache`, e.g. one with an on-disk tier."""
+    global _default_model
+    _default_model = MatchModel(cache)
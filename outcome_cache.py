@@ -0,0 +1,209 @@
+import io
+import os
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+from innings_dp import outcome_distribution
+from innings_engine import MAX_PICK, use_outcome_cache
+
+
+# Cached distributions of how the rest of an innings ends, keyed by match state.
+# A TableStore keeps many tables back to back in one memory-mapped file (with
+# an .index.npy beside it), so processes reading the same store share its pages
+# instead of each holding its own copies.
+CUTOFF = 1e-15
+TABLE_DTYPE = np.dtype([("runs", "<u2"), ("balls", "<u2"), ("wickets", "u1"), ("prob", "<f8"), ("alias", "<i4")])
+INDEX_DTYPE = np.dtype([("max_pick", "<u2"), ("balls", "<u2"), ("wickets", "<u2"), ("runs_needed", "<i4"),
+                        ("start", "<i8"), ("stop", "<i8")])
+
+
+def build_alias(prob):
+    """Return (scaled probabilities, aliases) for Vose's alias method."""
+    n = len(prob)
+    scaled = (prob * n).tolist()  # Plain lists: the loop below is scalar work
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        alias[s] = l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    for i in small + large:
+        scaled[i] = 1.0  # Leftovers are 1 up to rounding error
+    return np.array(scaled), np.array(alias, dtype=np.int32)
+
+
+class OutcomeTable:
+    """One state's outcome distribution, sampled in O(1) per draw with an alias table."""
+
+    __slots__ = ("data", "_columns")
+
+    def __init__(self, data):
+        self.data = data
+        self._columns = (data["prob"], data["alias"], data["runs"], data["balls"], data["wickets"])
+
+    @classmethod
+    def build(cls, balls_left, wickets_left, runs_needed=None, max_pick=MAX_PICK):
+        """Compute the exact distribution for a state and index it for sampling."""
+        runs, balls, wickets, prob = outcome_distribution(runs_needed, balls_left, wickets_left, max_pick, CUTOFF)
+        data = np.empty(len(prob), dtype=TABLE_DTYPE)
+        data["runs"], data["balls"], data["wickets"] = runs, balls, wickets
+        data["prob"], data["alias"] = build_alias(prob)
+        return cls(data)
+
+    def sample(self, rng, size=None):
+        """Draw (runs added, balls used, wickets lost) for the rest of the innings."""
+        n = len(self.data)
+        count = 1 if size is None else size
+        picks = rng.integers(0, n, size=count)
+        coins = rng.random(count)
+        picks = np.where(coins < self.data["prob"][picks], picks, self.data["alias"][picks])
+        chosen = self.data[picks]
+        if size is None:
+            return int(chosen["runs"][0]), int(chosen["balls"][0]), int(chosen["wickets"][0])
+        return chosen["runs"], chosen["balls"], chosen["wickets"]
+
+    def draw(self, rng):
+        """Draw one (runs added, balls used, wickets lost) using a single uniform number."""
+        prob, alias, runs, balls, wickets = self._columns
+        u = rng.random() * len(prob)
+        i = int(u)
+        if u - i >= prob[i]:
+            i = alias[i]
+        return int(runs[i]), int(balls[i]), int(wickets[i])
+
+    def to_bytes(self):
+        """Serialise the table for the on-disk tier."""
+        buffer = io.BytesIO()
+        np.save(buffer, self.data, allow_pickle=False)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, blob):
+        """Load a table written by to_bytes."""
+        return cls(np.load(io.BytesIO(blob), allow_pickle=False))
+
+
+class TableStore:
+    """Read-only OutcomeTables packed into one memory-mapped file, keyed like OutcomeCache."""
+
+    __slots__ = ("data", "spans")
+
+    def __init__(self, data, index):
+        self.data = data
+        self.spans = {}
+        for row in index.tolist():
+            max_pick, balls, wickets, runs_needed, start, stop = row
+            self.spans[max_pick, balls, wickets, None if runs_needed < 0 else runs_needed] = (start, stop)
+
+    def get(self, key):
+        """Return the table for a (max_pick, balls_left, wickets_left, runs_needed) key, or None."""
+        span = self.spans.get(key)
+        return None if span is None else OutcomeTable(self.data[span[0]:span[1]])
+
+    @staticmethod
+    def save(path, tables):
+        """Write (key, OutcomeTable) pairs to `path`, one table at a time, and their index to `path`.index.npy.
+
+        `tables` may be a generator, so a store can be built without holding
+        more than one table in memory. The index is written last: a store whose
+        index exists is complete.
+        """
+        rows = []
+        stop = 0
+        with open(f"{path}.tmp", "wb") as f:
+            for (max_pick, balls, wickets, runs_needed), table in tables:
+                f.write(table.data.tobytes())
+                start, stop = stop, stop + len(table.data)
+                rows.append((max_pick, balls, wickets, -1 if runs_needed is None else runs_needed, start, stop))
+        os.replace(f"{path}.tmp", path)
+        tmp = f"{path}.index.tmp.npy"
+        np.save(tmp, np.array(rows, dtype=INDEX_DTYPE), allow_pickle=False)
+        os.replace(tmp, f"{path}.index.npy")  # Readers never see a half-written store
+
+    @staticmethod
+    def exists(path):
+        """Return True if a complete store was saved at `path`."""
+        return os.path.exists(f"{path}.index.npy")
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a store written by save."""
+        index = np.load(f"{path}.index.npy")
+        if not len(index):
+            return cls(np.empty(0, TABLE_DTYPE), index)
+        return cls(np.memmap(path, dtype=TABLE_DTYPE, mode="r"), index)
+
+
+class OutcomeCache:
+    """LRU cache of OutcomeTables with an optional SQLite tier shared between processes and runs.
+
+    Tables found in `store` (a TableStore) are used in place, never copied.
+    """
+
+    def __init__(self, maxsize=256, path=None, store=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.store = store
+        self.tables = OrderedDict()
+        self.hits = self.misses = 0
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS outcomes (key TEXT PRIMARY KEY, data BLOB NOT NULL)")
+            self._db.commit()
+
+    def get(self, balls_left, wickets_left, runs_needed=None, max_pick=MAX_PICK):
+        """Return the OutcomeTable for a state, building and storing it on a miss."""
+        key = (max_pick, balls_left, wickets_left, runs_needed)
+        table = self.tables.get(key)
+        if table is not None:
+            self.tables.move_to_end(key)
+            self.hits += 1
+            return table
+
+        self.misses += 1
+        table = self._load(key)
+        if table is None:
+            table = OutcomeTable.build(balls_left, wickets_left, runs_needed, max_pick)
+            self._store(key, table)
+        self.tables[key] = table
+        if len(self.tables) > self.maxsize:
+            self.tables.popitem(last=False)
+        return table
+
+    def sample(self, rng, balls_left, wickets_left, runs_needed=None, max_pick=MAX_PICK, size=None):
+        """Draw how the rest of an innings ends from the cached distribution."""
+        return self.get(balls_left, wickets_left, runs_needed, max_pick).sample(rng, size)
+
+    def _load(self, key):
+        """Return the table for `key` from the shared store or the on-disk tier, if there is one."""
+        table = self.store.get(key) if self.store is not None else None
+        if table is not None or self._db is None:
+            return table
+        row = self._db.execute("SELECT data FROM outcomes WHERE key = ?", (repr(key),)).fetchone()
+        return OutcomeTable.from_bytes(row[0]) if row else None
+
+    def _store(self, key, table):
+        """Save a freshly built table to the on-disk tier."""
+        if self._db is None:
+            return
+        self._db.execute("INSERT OR IGNORE INTO outcomes (key, data) VALUES (?, ?)", (repr(key), table.to_bytes()))
+        self._db.commit()
+
+    def close(self):
+        """Close the on-disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+def enable(maxsize=256, path=None):
+    """Create an OutcomeCache and let the innings engine use it for whole remaining innings."""
+    cache = OutcomeCache(maxsize, path)
+    use_outcome_cache(cache)
+    return cache
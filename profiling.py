@@ -0,0 +1,199 @@
+import functools
+import inspect
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+
+# Named timing spans and counters for finding where a run spends its time.
+# Profiling is off unless enabled from the command line (--profile) or with the
+# HTG_PROFILE environment variable; while off, a span is a shared no-op object
+# and a counter is a single attribute check.
+ENV_VAR = "HTG_PROFILE"  # "1" prints a summary; a path ending in .json also writes a trace there
+
+
+class _Span:
+    """Context manager that records one timed span."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+
+
+class _NoSpan:
+    """The span handed out while profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Profiler:
+    """Collects span durations, counters and, optionally, trace events."""
+
+    __slots__ = ("enabled", "durations", "counters", "events", "origin")
+
+    def __init__(self, enabled=True, trace=False):
+        self.enabled = enabled
+        self.durations = {}
+        self.counters = {}
+        self.events = [] if trace else None
+        self.origin = time.perf_counter()
+
+    def span(self, name):
+        """Return a context manager timing the code it wraps under `name`."""
+        return _Span(self, name) if self.enabled else _NO_SPAN
+
+    def record(self, name, start, end):
+        """Record a span measured elsewhere, in perf_counter seconds."""
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations[name] = []
+        durations.append(end - start)
+        if self.events is not None:
+            self.events.append((name, start, end))
+
+    def record_slices(self, name, slices):
+        """Record one span that ran in several (start, end) slices, such as a generator between its yields."""
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations[name] = []
+        durations.append(sum(end - start for start, end in slices))
+        if self.events is not None:
+            self.events.extend((name, start, end) for start, end in slices)
+
+    def count(self, name, n=1):
+        """Add n to a counter."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        """Return {span: {"count", "total", "p50", "p99"}} in seconds, plus {"counters": {...}}."""
+        spans = {}
+        for name, durations in self.durations.items():
+            values = np.array(durations)
+            p50, p99 = np.percentile(values, [50, 99])
+            spans[name] = {"count": len(values), "total": float(values.sum()), "p50": float(p50), "p99": float(p99)}
+        return {"spans": spans, "counters": dict(self.counters)}
+
+    def report(self, stream=None):
+        """Print the summary as a table, slowest total first."""
+        stream = stream or sys.stderr
+        summary = self.summary()
+        print(f"\n{'span':<20}{'count':>10}{'total s':>12}{'p50 ms':>12}{'p99 ms':>12}", file=stream)
+        for name, stats in sorted(summary["spans"].items(), key=lambda item: -item[1]["total"]):
+            print(f"{name:<20}{stats['count']:>10,}{stats['total']:>12.3f}"
+                  f"{stats['p50'] * 1000:>12.3f}{stats['p99'] * 1000:>12.3f}", file=stream)
+        for name, value in sorted(summary["counters"].items()):
+            print(f"{name:<20}{value:>10,}", file=stream)
+
+    def write_trace(self, path):
+        """Write the recorded spans as Chrome trace JSON (also opens in speedscope and Perfetto)."""
+        pid = os.getpid()
+        events = [{"name": name, "ph": "X", "pid": pid, "tid": 0,
+                   "ts": (start - self.origin) * 1e6, "dur": (end - start) * 1e6}
+                  for name, start, end in self.events or ()]
+        end = (time.perf_counter() - self.origin) * 1e6
+        events += [{"name": name, "ph": "C", "pid": pid, "tid": 0, "ts": end, "args": {name: value}}
+                   for name, value in self.counters.items()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+_active = Profiler(enabled=False)
+_trace_path = None
+
+
+def get_profiler():
+    """Return the profiler in use (a disabled one unless profiling was enabled)."""
+    return _active
+
+
+def enable(trace_path=None):
+    """Start profiling; spans are also kept for a trace file when `trace_path` is given."""
+    global _active, _trace_path
+    _active = Profiler(trace=trace_path is not None)
+    _trace_path = trace_path
+    return _active
+
+
+def enable_from(option=None):
+    """Enable profiling from a --profile value or, failing that, the HTG_PROFILE variable."""
+    option = option or os.environ.get(ENV_VAR)
+    if not option or option == "0":
+        return None
+    return enable(option if option.endswith(".json") else None)
+
+
+def finish(stream=None):
+    """Print the summary and write the trace file, if profiling is on."""
+    if _active.enabled:
+        _active.report(stream)
+        if _trace_path:
+            _active.write_trace(_trace_path)
+
+
+def timed(name):
+    """Decorator recording a span named `name` around each call.
+
+    A generator function's span only counts the time it runs between being
+    resumed and its next yield, so time spent waiting for an answer is left out.
+    """
+
+    def decorate(func):
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _active.enabled:
+                    return (yield from func(*args, **kwargs))
+                profiler = _active
+                steps = func(*args, **kwargs)
+                slices = []
+                resume, value = steps.send, None
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            prompt = resume(value)
+                        except StopIteration as stop:
+                            return stop.value
+                        finally:
+                            slices.append((start, time.perf_counter()))
+                        try:
+                            value, resume = (yield prompt), steps.send
+                        except GeneratorExit:
+                            steps.close()
+                            raise
+                        except BaseException as error:
+                            value, resume = error, steps.throw
+                finally:
+                    profiler.record_slices(name, slices)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not _active.enabled:
+                    return func(*args, **kwargs)
+                with _active.span(name):
+                    return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+
+from innings_dp import ball_probabilities
+from innings_engine import BALLS_PER_INNINGS, MAX_PICK, WICKETS_PER_INNINGS
+
+
+# Live projections for an innings in progress, read from one table built once
+# instead of simulating the rest of the innings on every ball. Under the ball
+# model of innings_dp, table[REACH, b, w, r] is the probability of adding at
+# least r runs in the next b balls with w wickets in hand, and
+# table[EXPECTED, b, w, r] is the expected number of runs added, counting at most
+# r of them. Runs never go down, so "at least r" is also the probability that a
+# chase needing r gets there. Saved as .npy, the table is memory-mapped, so every
+# session and process shares the same pages.
+REACH = 0
+EXPECTED = 1
+
+
+class Projection:
+    """Win probability and projected score lookups for an innings in progress."""
+
+    __slots__ = ("table", "balls", "wickets")
+
+    def __init__(self, table, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS):
+        self.table = table
+        self.balls = balls
+        self.wickets = wickets
+
+    def _runs(self, runs):
+        return min(max(runs, 0), self.table.shape[3] - 1)
+
+    def chase(self, score, target, ball_count, wickets_lost):
+        """Return (win probability, tie probability) of the side chasing `target` from score/wickets_lost."""
+        balls_left, wickets_left = self.balls - ball_count, self.wickets - wickets_lost
+        needed = target - score
+        reach = self.table[REACH, balls_left, wickets_left]
+        win = float(reach[self._runs(needed)])
+        return win, float(reach[self._runs(needed - 1)]) - win
+
+    def defend(self, score, ball_count, wickets_lost):
+        """Return (win probability, tie probability) of the side batting first, from score/wickets_lost.
+
+        Each final score is weighted by its chance and met by a chase of the
+        whole innings length from 0/0.
+        """
+        reach = self.table[REACH, self.balls - ball_count, self.wickets - wickets_lost]
+        final = np.minimum(score + np.arange(len(reach)), len(reach) - 1)  # Final score if a runs are added
+        added = reach - np.append(reach[1:], 0.0)  # Chance of adding exactly a runs
+        chase = self.table[REACH, self.balls, self.wickets]
+        caught = chase[np.minimum(final + 1, len(reach) - 1)]  # The chase passes the final score
+        level = chase[final] - caught  # The chase ends level
+        return float(added @ (1.0 - chase[final])), float(added @ level)
+
+    def projected_score(self, score, ball_count, wickets_lost, target=None):
+        """Return the expected final score; a chase stops counting at the target."""
+        cap = self.table.shape[3] - 1 if target is None else self._runs(target - score)
+        return score + float(self.table[EXPECTED, self.balls - ball_count, self.wickets - wickets_lost, cap])
+
+
+def build(balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, max_pick=MAX_PICK):
+    """Return the [2, balls + 1, wickets + 1, balls * max_pick + 2] projection table."""
+    p_out, p_run = ball_probabilities(max_pick)
+    width = balls * max_pick + 2  # Up to one run more than an innings can score
+    reach = np.zeros((balls + 1, wickets + 1, width))
+    reach[:, :, 0] = 1.0  # Nothing more needed
+    padded = np.ones((wickets + 1, max_pick + width))  # Needing fewer than 0 runs counts as reaching
+    for ball in range(1, balls + 1):
+        before, after = reach[ball - 1], reach[ball]
+        padded[:, max_pick:] = before
+        after[1:, 1:] = p_out * before[:-1, 1:]  # A wicket falls
+        for runs in range(max_pick + 1):
+            after[1:, 1:] += p_run * padded[1:, max_pick + 1 - runs:max_pick + width - runs]
+    table = np.empty((2,) + reach.shape)
+    table[REACH] = reach
+    table[EXPECTED] = np.cumsum(reach, axis=2) - 1.0  # Sum of reach[1..r]
+    return table
+
+
+def load(path, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS, max_pick=MAX_PICK):
+    """Return a Projection memory-mapped from the .npy at `path`, building and saving it first if needed."""
+    shape = (2, balls + 1, wickets + 1, balls * max_pick + 2)
+    if os.path.exists(path):
+        table = np.load(path, mmap_mode="r")
+        if table.shape == shape:
+            return Projection(table, balls, wickets)
+    tmp = f"{path}.tmp.npy"
+    np.save(tmp, build(balls, wickets, max_pick))
+    os.replace(tmp, path)  # Other processes never see a half-written table
+    return Projection(np.load(path, mmap_mode="r"), balls, wickets)
+
+
+_default_projection = None
+
+
+def get_projection(projection=None):
+    """Return `projection`, or a shared in-memory Projection built on first use."""
+    global _default_projection
+    if projection is not None:
+        return projection
+    if _default_projection is None:
+        _default_projection = Projection(build())
+    return _default_projection
+
+
+def use_projection(path):
+    """Make the shared Projection the table memory-mapped from `path`."""
+    global _default_projection
+    _default_projection = load(path)
+    return _default_projection
@@ -0,0 +1,55 @@
+import sys
+
+
+# Verbosity levels, from quietest to noisiest.
+SILENT = 0
+SUMMARY = 1
+MATCH = 2
+BALL = 3
+LEVELS = {"silent": SILENT, "summary": SUMMARY, "match": MATCH, "ball": BALL}
+
+
+class Reporter:
+    """Console output filtered by verbosity level.
+
+    Messages are str.format templates; the arguments are only formatted when the
+    level is enabled, so a silent reporter does no string work at all.
+    """
+
+    __slots__ = ("level", "stream")
+
+    def __init__(self, level=BALL, stream=None):
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        self.stream = stream
+
+    def enabled(self, level):
+        """Return True if messages at `level` are shown."""
+        return level <= self.level
+
+    def emit(self, level, message, *args):
+        """Show `message` formatted with `args` if `level` is enabled."""
+        if level <= self.level:
+            print(message.format(*args) if args else message, file=self.stream or sys.stdout)
+
+    def summary(self, message, *args):
+        """Tournament-level output: groups, schedule, final tables and results."""
+        if self.level >= SUMMARY:
+            print(message.format(*args) if args else message, file=self.stream or sys.stdout)
+
+    def match(self, message, *args):
+        """Per-match output: toss, innings progress, scores and tables."""
+        if self.level >= MATCH:
+            print(message.format(*args) if args else message, file=self.stream or sys.stdout)
+
+    def ball(self, message, *args):
+        """Ball-by-ball output."""
+        if self.level >= BALL:
+            print(message.format(*args) if args else message, file=self.stream or sys.stdout)
+
+
+_default_reporter = Reporter()
+
+
+def get_reporter(reporter=None):
+    """Return `reporter`, or the shared reporter that shows everything when it is None."""
+    return _default_reporter if reporter is None else reporter
@@ -0,0 +1,107 @@
+import numpy as np
+
+
+BACKENDS = {"pcg64": np.random.PCG64, "philox": np.random.Philox}
+BLOCK_SIZE = 1024
+
+
+class GameRNG:
+    """Seedable random source shared by the game and the simulators.
+
+    Small draws (randint, choice) are served from pre-drawn NumPy blocks instead
+    of one Python-level call each. stream(*key) derives an independent generator
+    from the master seed, so any match, innings or worker can be replayed on its own.
+    """
+
+    __slots__ = ("seed_seq", "backend", "generator", "block", "_buffers")
+
+    def __init__(self, seed=None, backend="pcg64", block=BLOCK_SIZE):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown RNG backend {backend!r}, choose from {sorted(BACKENDS)}.")
+        self.seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.backend = backend
+        self.generator = np.random.Generator(BACKENDS[backend](self.seed_seq))
+        self.block = block
+        self._buffers = {}
+
+    @property
+    def seed(self):
+        """Return the master entropy this generator was created from."""
+        return self.seed_seq.entropy
+
+    def stream(self, *key):
+        """Return the independent generator for `key` (non-negative ints) under this seed."""
+        child = np.random.SeedSequence(self.seed_seq.entropy, spawn_key=self.seed_seq.spawn_key + key)
+        return GameRNG(child, self.backend, self.block)
+
+    def spawn(self, n):
+        """Return n independent child generators, e.g. one per worker."""
+        return [GameRNG(child, self.backend, self.block) for child in self.seed_seq.spawn(n)]
+
+    def jumped(self, jumps=1):
+        """Return a copy of this generator jumped ahead by `jumps` large fixed strides."""
+        jumped = GameRNG.__new__(GameRNG)
+        jumped.seed_seq = self.seed_seq
+        jumped.backend = self.backend
+        jumped.generator = np.random.Generator(self.generator.bit_generator.jumped(jumps))
+        jumped.block = self.block
+        jumped._buffers = {}
+        return jumped
+
+    def randint(self, low, high):
+        """Return a random integer in [low, high], like random.randint."""
+        buffer = self._buffers.get((low, high))
+        if buffer is None or buffer[1] == len(buffer[0]):
+            buffer = [self.generator.integers(low, high + 1, size=self.block).tolist(), 0]
+            self._buffers[(low, high)] = buffer
+        value = buffer[0][buffer[1]]
+        buffer[1] += 1
+        return value
+
+    def choice(self, seq):
+        """Return a random element of a non-empty sequence."""
+        return seq[self.randint(0, len(seq) - 1)]
+
+    def shuffle(self, items):
+        """Shuffle a list in place."""
+        items[:] = [items[i] for i in self.generator.permutation(len(items))]
+
+    def permutation(self, n):
+        """Return a random permutation of range(n) as an array."""
+        return self.generator.permutation(n)
+
+    def random(self, size=None):
+        """Draw floats in [0, 1), like numpy.random.Generator.random; single draws are buffered."""
+        if size is not None:
+            return self.generator.random(size)
+        buffer = self._buffers.get("random")
+        if buffer is None or buffer[1] == len(buffer[0]):
+            buffer = [self.generator.random(self.block).tolist(), 0]
+            self._buffers["random"] = buffer
+        value = buffer[0][buffer[1]]
+        buffer[1] += 1
+        return value
+
+    def integers(self, low, high=None, size=None, dtype=np.int64):
+        """Draw an array of integers in [low, high), like numpy.random.Generator.integers."""
+        return self.generator.integers(low, high, size=size, dtype=dtype)
+
+
+_default_rng = None
+
+
+def get_rng(rng=None):
+    """Return `rng`, or the shared unseeded generator when it is None."""
+    global _default_rng
+    if rng is not None:
+        return rng
+    if _default_rng is None:
+        _default_rng = GameRNG()
+    return _default_rng
+
+
+def seed(value=None, backend="pcg64"):
+    """Replace the shared generator with a seeded one and return it."""
+    global _default_rng
+    _default_rng = GameRNG(value, backend)
+    return _default_rng
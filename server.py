@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import io
+import json
+
+from main import tournament
+from projection import get_projection, use_projection
+from reporting import LEVELS, Reporter
+from rng import GameRNG
+from strategy import DIFFICULTIES
+
+
+# Hosts many interactive tournaments in one process. Each connection drives its
+# own game generator and every prompt is awaited on the socket, so a player who
+# is thinking costs a suspended coroutine instead of a thread.
+#
+# Protocol (one line each way per prompt): the server sends a JSON object
+# {"output": text printed since the last prompt, "prompt": the question}, the
+# client answers with a line of text. The last message carries "champion"
+# instead of "prompt" and the server closes the connection.
+DEFAULT_PORT = 8765
+BACKLOG = 4096  # Room for thousands of players connecting at once
+
+
+class Session:
+    """One player's tournament and the console output it has produced since the last prompt."""
+
+    __slots__ = ("steps", "output")
+
+    def __init__(self, rng, verbosity="ball", difficulty="easy"):
+        self.output = io.StringIO()
+        self.steps = tournament(rng, Reporter(verbosity, self.output), difficulty=difficulty)
+
+    def _drain(self):
+        text = self.output.getvalue()
+        self.output.seek(0)
+        self.output.truncate()
+        return text
+
+    def advance(self, answer=None):
+        """Send `answer` to the game (None starts it) and return the next message for the client."""
+        try:
+            prompt = self.steps.send(answer)
+        except StopIteration as stop:
+            return {"output": self._drain(), "champion": stop.value}
+        return {"output": self._drain(), "prompt": prompt}
+
+    def close(self):
+        """Abandon the game if it is still running."""
+        self.steps.close()
+
+
+class GameServer:
+    """Serves a Session per connection; session i plays on stream i of the server seed."""
+
+    def __init__(self, seed=None, backend="pcg64", verbosity="ball", difficulty="easy"):
+        self.rng = GameRNG(seed, backend)
+        self.verbosity = verbosity
+        self.difficulty = difficulty
+        self.started = 0
+        self.active = 0
+
+    async def handle(self, reader, writer):
+        """Play one tournament over a connection."""
+        session = Session(self.rng.stream(self.started), self.verbosity, self.difficulty)
+        self.started += 1
+        self.active += 1
+        try:
+            message = session.advance()
+            while True:
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+                if "prompt" not in message:
+                    break
+                line = await reader.readline()
+                if not line:
+                    break  # The player left mid-game
+                message = session.advance(line.decode().rstrip("\r\n"))
+        except ConnectionError:
+            pass
+        finally:
+            self.active -= 1
+            session.close()
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT, path=None, backlog=BACKLOG):
+        """Start listening on a TCP port, or on a Unix socket when `path` is given."""
+        if path:
+            return await asyncio.start_unix_server(self.handle, path, backlog=backlog)
+        return await asyncio.start_server(self.handle, host, port, backlog=backlog)
+
+
+async def serve(host, port, path, seed, backend, verbosity, difficulty):
+    server = await GameServer(seed, backend, verbosity, difficulty).start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host interactive tournaments for many players at once.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", default=None, metavar="PATH", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--seed", type=int, default=None, help="server seed; session i replays stream i of it")
+    parser.add_argument("--rng", choices=["pcg64", "philox"], default="pcg64", help="random number backend")
+    parser.add_argument("--verbosity", choices=list(LEVELS), default="ball", help="how much output to send players")
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), default="easy", help="computer opponent")
+    parser.add_argument("--projection", default=None, metavar="PATH",
+                        help="memory-map the live projection table from this .npy file, building it there if missing")
+    args = parser.parse_args()
+    if args.projection:
+        use_projection(args.projection)
+    else:
+        get_projection()  # Build the table now rather than on some player's first ball
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.seed, args.rng, args.verbosity, args.difficulty))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
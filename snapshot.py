@@ -0,0 +1,225 @@
+import os
+import struct
+
+import numpy as np
+
+from rng import GameRNG
+from standings import GroupTable
+
+
+# Versioned binary snapshots for resuming a tournament or a batch run.
+# Layout: a 16 byte header, then fields written back to back. Strings are
+# length-prefixed UTF-8, integers little-endian, tables packed NumPy records.
+# The RNG is stored as its seed and spawn key: every match and every batch run
+# draws from its own stream of that seed, so nothing else is needed to carry on.
+# Version 2 appends the match format to batch snapshots and version 3 to
+# tournament snapshots; older ones are T20.
+MAGIC = b"HTGSNAPS"
+VERSION = 3
+HEADER = np.dtype([("magic", "S8"), ("version", "<u4"), ("kind", "<u4")])
+TOURNAMENT = 1
+BATCH = 2
+ROW_DTYPE = np.dtype([("wins", "<u2"), ("losses", "<u2"), ("draws", "<u2"), ("points", "<u2"), ("nrr", "<f8")])
+COMPUTER = 0xFF  # user_team index when the computer controls every team
+
+
+class TournamentState:
+    """An interactive tournament between two matches."""
+
+    __slots__ = ("rng", "groups", "user_team", "tables", "played", "knockout", "match_format")
+
+    def __init__(self, rng, groups, user_team, tables, played, knockout=(), match_format="t20"):
+        self.rng = rng
+        self.groups = groups  # Lists of team names
+        self.user_team = user_team
+        self.tables = tables  # One GroupTable per group
+        self.played = played  # Group matches finished
+        self.knockout = list(knockout)  # Winners of the knockout matches finished so far
+        self.match_format = match_format  # Key of match_engine.MATCH_FORMATS
+
+
+class BatchState:
+    """Counts gathered by the first `done` runs of a simulate_tournament batch."""
+
+    __slots__ = ("teams", "fmt", "seed", "backend", "n_runs", "done", "titles", "semifinals", "finishes",
+                 "match_format")
+
+    def __init__(self, teams, fmt, seed, backend, n_runs, done, titles, semifinals, finishes, match_format="t20"):
+        self.teams = list(teams)
+        self.fmt = tuple(fmt)  # (groups, legs, advance, super_groups, super_advance)
+        self.seed = seed
+        self.backend = backend
+        self.n_runs = n_runs
+        self.done = done
+        self.titles = titles
+        self.semifinals = semifinals
+        self.finishes = finishes
+        self.match_format = match_format  # Key of match_engine.MATCH_FORMATS
+
+
+class _Reader:
+    """Reads snapshot fields back in the order they were written."""
+
+    __slots__ = ("data", "pos", "version")
+
+    def __init__(self, data, version=VERSION):
+        self.data = data
+        self.pos = 0
+        self.version = version
+
+    def take(self, size):
+        """Return the next `size` bytes."""
+        chunk = self.data[self.pos:self.pos + size]
+        if len(chunk) != size:
+            raise ValueError("Snapshot is truncated.")
+        self.pos += size
+        return chunk
+
+    def unpack(self, fmt):
+        """Return the next struct-packed values."""
+        return struct.unpack(fmt, self.take(struct.calcsize(fmt)))
+
+    def string(self):
+        """Return the next length-prefixed string."""
+        (size,) = self.unpack("<H")
+        return self.take(size).decode()
+
+    def strings(self):
+        """Return the next count-prefixed list of strings."""
+        (count,) = self.unpack("<H")
+        return [self.string() for _ in range(count)]
+
+    def array(self, dtype, count):
+        """Return the next `count` items of `dtype` as a writable array."""
+        dtype = np.dtype(dtype)
+        return np.frombuffer(self.take(dtype.itemsize * count), dtype=dtype).copy()
+
+
+def _string(text):
+    """Pack a length-prefixed string."""
+    data = text.encode()
+    return struct.pack("<H", len(data)) + data
+
+
+def _strings(texts):
+    """Pack a count-prefixed list of strings."""
+    return struct.pack("<H", len(texts)) + b"".join(_string(text) for text in texts)
+
+
+def _pack_rng(rng):
+    """Pack a GameRNG as backend, seed entropy and spawn key."""
+    entropy = rng.seed_seq.entropy
+    if not isinstance(entropy, int):
+        raise ValueError("Only integer seeds can be stored in a snapshot.")
+    data = entropy.to_bytes((entropy.bit_length() + 7) // 8, "little")
+    key = rng.seed_seq.spawn_key
+    return (_string(rng.backend) + struct.pack("<H", len(data)) + data
+            + struct.pack(f"<B{len(key)}I", len(key), *key))
+
+
+def _unpack_rng(reader):
+    """Rebuild the GameRNG packed by _pack_rng."""
+    backend = reader.string()
+    (size,) = reader.unpack("<H")
+    entropy = int.from_bytes(reader.take(size), "little")
+    (count,) = reader.unpack("<B")
+    key = reader.unpack(f"<{count}I")
+    return GameRNG(np.random.SeedSequence(entropy, spawn_key=key), backend)
+
+
+def _pack_table(table):
+    """Pack a GroupTable's teams and columns."""
+    rows = np.empty(len(table), dtype=ROW_DTYPE)
+    rows["wins"], rows["losses"], rows["draws"] = table.wins, table.losses, table.draws
+    rows["points"], rows["nrr"] = table.points, table.nrr
+    return _strings(table.teams) + rows.tobytes()
+
+
+def _unpack_table(reader):
+    """Rebuild the GroupTable packed by _pack_table."""
+    teams = reader.strings()
+    rows = reader.array(ROW_DTYPE, len(teams))
+    return GroupTable.restore(teams, rows["wins"], rows["losses"], rows["draws"], rows["points"], rows["nrr"])
+
+
+def _write(path, kind, body):
+    """Write a snapshot atomically, so a crash mid-write keeps the previous one."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(np.array((MAGIC, VERSION, kind), dtype=HEADER).tobytes())
+        f.write(body)
+    os.replace(tmp, path)
+
+
+def _read(path, kind):
+    """Return a _Reader over the body of a snapshot of `kind`."""
+    with open(path, "rb") as f:
+        data = f.read()
+    header = np.frombuffer(data[:HEADER.itemsize], dtype=HEADER)
+    if len(header) != 1 or header[0]["magic"] != MAGIC or not 1 <= header[0]["version"] <= VERSION \
+            or header[0]["kind"] != kind:
+        raise ValueError(f"{path} is not a version 1 to {VERSION} snapshot of this kind.")
+    reader = _Reader(data, int(header[0]["version"]))
+    reader.pos = HEADER.itemsize
+    return reader
+
+
+def save_tournament(path, state):
+    """Write a TournamentState snapshot."""
+    teams = [team for group in state.groups for team in group]
+    user = COMPUTER if state.user_team == "computer" else teams.index(state.user_team)
+    body = [_pack_rng(state.rng), struct.pack("<BHB", user, state.played, len(state.groups))]
+    body += [_pack_table(table) for table in state.tables]
+    body.append(struct.pack(f"<B{len(state.knockout)}B", len(state.knockout),
+                            *(teams.index(team) for team in state.knockout)))
+    body.append(_string(state.match_format))
+    _write(path, TOURNAMENT, b"".join(body))
+
+
+def load_tournament(path):
+    """Read a snapshot written by save_tournament."""
+    reader = _read(path, TOURNAMENT)
+    rng = _unpack_rng(reader)
+    user, played, n_groups = reader.unpack("<BHB")
+    tables = [_unpack_table(reader) for _ in range(n_groups)]
+    groups = [list(table.teams) for table in tables]
+    teams = [team for group in groups for team in group]
+    (count,) = reader.unpack("<B")
+    knockout = [teams[i] for i in reader.unpack(f"<{count}B")]
+    user_team = "computer" if user == COMPUTER else teams[user]
+    match_format = reader.string() if reader.version >= 3 else "t20"
+    return TournamentState(rng, groups, user_team, tables, played, knockout, match_format)
+
+
+def save_batch(path, state):
+    """Write a BatchState snapshot."""
+    seed = state.seed.to_bytes((state.seed.bit_length() + 7) // 8, "little")
+    rows, cols = state.finishes.shape
+    body = [
+        _strings(state.teams),
+        struct.pack("<5B", *state.fmt),
+        struct.pack("<H", len(seed)) + seed,
+        _string(state.backend),
+        struct.pack("<QQHH", state.n_runs, state.done, rows, cols),
+        state.titles.astype("<i8").tobytes(),
+        state.semifinals.astype("<i8").tobytes(),
+        state.finishes.astype("<i8").tobytes(),
+        _string(state.match_format),
+    ]
+    _write(path, BATCH, b"".join(body))
+
+
+def load_batch(path):
+    """Read a snapshot written by save_batch."""
+    reader = _read(path, BATCH)
+    teams = reader.strings()
+    fmt = reader.unpack("<5B")
+    (size,) = reader.unpack("<H")
+    seed = int.from_bytes(reader.take(size), "little")
+    backend = reader.string()
+    n_runs, done, rows, cols = reader.unpack("<QQHH")
+    titles = reader.array("<i8", len(teams)).astype(np.int64)
+    semifinals = reader.array("<i8", len(teams)).astype(np.int64)
+    finishes = reader.array("<i8", rows * cols).astype(np.int64).reshape(rows, cols)
+    match_format = reader.string() if reader.version >= 2 else "t20"
+    return BatchState(teams, fmt, seed, backend, n_runs, done, titles, semifinals, finishes, match_format)
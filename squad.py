@@ -0,0 +1,306 @@
+import numpy as np
+
+from innings_engine import MAX_PICK, WICKETS_PER_INNINGS
+
+
+# Squads, batting orders and per-player batting figures. One batter faces each
+# ball until dismissed, then the next in the order comes in, so the batter on
+# strike is batting_order[wickets_lost]. Figures are NumPy columns indexed by
+# player id rather than a dict per player, so adding up whole batches of innings
+# is a handful of bincounts and the memory is a few bytes per player per column.
+# Innings drawn whole from outcome tables have no balls to credit, so their split
+# between the batters is sampled to match the drawn totals (split_innings).
+SQUAD_SIZE = 15
+XI_SIZE = WICKETS_PER_INNINGS + 1
+XI_RULE = f"An XI is {XI_SIZE} different squad numbers between 1 and {SQUAD_SIZE}."
+
+_run_sums = {}  # max_pick -> run_sum_table
+
+
+class BattingStats:
+    """Career batting figures as columns indexed by player id."""
+
+    __slots__ = ("innings", "runs", "balls", "dismissals", "high_score")
+
+    COLUMNS = ("Innings", "Runs", "Balls", "Outs", "High Score", "Average", "Strike Rate")
+
+    def __init__(self, size):
+        self.innings = np.zeros(size, dtype=np.int64)
+        self.runs = np.zeros(size, dtype=np.int64)
+        self.balls = np.zeros(size, dtype=np.int64)
+        self.dismissals = np.zeros(size, dtype=np.int64)
+        self.high_score = np.zeros(size, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.runs)
+
+    def record_innings(self, players, runs, balls, dismissals):
+        """Add many batters' innings at once; every argument is an array of the same shape, players being ids."""
+        players = np.asarray(players).ravel()
+        size = len(self.runs)
+        self.innings += np.bincount(players, minlength=size)
+        self.runs += np.bincount(players, np.asarray(runs).ravel(), minlength=size).astype(np.int64)
+        self.balls += np.bincount(players, np.asarray(balls).ravel(), minlength=size).astype(np.int64)
+        self.dismissals += np.bincount(players, np.asarray(dismissals).ravel(), minlength=size).astype(np.int64)
+        np.maximum.at(self.high_score, players, np.asarray(runs).ravel())
+
+    def merge(self, other):
+        """Add another BattingStats over the same players, e.g. from a worker."""
+        self.innings += other.innings
+        self.runs += other.runs
+        self.balls += other.balls
+        self.dismissals += other.dismissals
+        np.maximum(self.high_score, other.high_score, out=self.high_score)
+
+    def averages(self):
+        """Return runs per dismissal (NaN for players never out)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.dismissals > 0, self.runs / self.dismissals, np.nan)
+
+    def strike_rates(self):
+        """Return runs per 100 balls (NaN for players who faced none)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.balls > 0, 100 * self.runs / self.balls, np.nan)
+
+    def to_dataframe(self, names, players=None):
+        """Export the rows of `players` (every player by default) as a pandas DataFrame, most runs first."""
+        import pandas as pd  # Only needed for display and export
+
+        players = np.arange(len(self.runs)) if players is None else np.asarray(players)
+        players = players[np.argsort(-self.runs[players], kind="stable")]
+        columns = (self.innings, self.runs, self.balls, self.dismissals, self.high_score,
+                   self.averages(), self.strike_rates())
+        return pd.DataFrame({name: column[players] for name, column in zip(self.COLUMNS, columns)},
+                            index=[names[i] for i in players])
+
+
+def batting_splits(bat, bowl, balls_used, start_wickets=0, slots=XI_SIZE):
+    """Split innings of ball-by-ball picks between the batters of the order.
+
+    `bat` and `bowl` are (innings, balls) pick arrays as simulate_innings_batch
+    draws them and `balls_used` how many of each row were bowled. Returns the
+    (innings, slots) runs, balls faced and dismissals of each batting position.
+    """
+    bat, bowl = np.atleast_2d(bat), np.atleast_2d(bowl)
+    n, width = bat.shape
+    bowled = np.arange(width)[None, :] < np.asarray(balls_used).reshape(-1, 1)
+    out = (bat == bowl) & bowled
+    position = np.minimum(np.cumsum(out, axis=1) - out + start_wickets, slots - 1)  # Wickets before this ball
+    cell = (np.arange(n)[:, None] * slots + position)[bowled]
+    size = n * slots
+
+    def tally(weights=None):
+        return np.bincount(cell, weights, minlength=size).reshape(n, slots).astype(np.int64)
+
+    return tally(np.where(out, 0, bat)[bowled]), tally(), tally(out[bowled])
+
+
+def run_sum_table(balls, max_pick=MAX_PICK):
+    """Return [n, r], the chance that n balls that are not wickets score r runs, for n up to at least `balls`.
+
+    Each such ball is worth 0..max_pick alike. One table per pick range is kept
+    and grown when more balls are asked for.
+    """
+    table = _run_sums.get(max_pick)
+    if table is None or len(table) <= balls:
+        rows = max(balls, 0 if table is None else len(table) - 1) + 1
+        table = np.zeros((rows, (rows - 1) * max_pick + 1))
+        table[0, 0] = 1.0
+        ball = np.full(max_pick + 1, 1 / (max_pick + 1))
+        for n in range(1, rows):
+            table[n, :n * max_pick + 1] = np.convolve(table[n - 1, :(n - 1) * max_pick + 1], ball)
+        _run_sums[max_pick] = table
+    return table
+
+
+def _pick(rng, weights):
+    """Return one column of each row of `weights`, drawn in proportion to the row."""
+    cumulative = np.cumsum(weights, axis=1)
+    return (cumulative <= (rng.random(len(weights)) * cumulative[:, -1])[:, None]).sum(axis=1)
+
+
+def split_innings(rng, runs, balls_used, lost, wickets=WICKETS_PER_INNINGS, stop=None, max_pick=MAX_PICK,
+                  slots=XI_SIZE):
+    """Sample how innings known only by their totals split between the batting positions.
+
+    Every argument after `rng` may be an array over innings; `stop` is the
+    score each innings would end on reaching (0 or None for none). Draws from
+    the ball-by-ball model given (runs, balls used, wickets lost): the wickets
+    fall on balls chosen alike (the last ball if all out), and the runs are
+    shared out by the chance of each batter's scoring balls making them. An
+    innings that reached `stop` ended on a scoring ball that took it there.
+    Returns the (innings, slots) runs, balls faced and dismissals like
+    batting_splits.
+    """
+    runs, balls_used, lost = (np.atleast_1d(np.asarray(x, dtype=np.int64)) for x in (runs, balls_used, lost))
+    stop = np.zeros_like(runs) if stop is None else np.broadcast_to(np.asarray(stop, dtype=np.int64), runs.shape)
+    n, width = len(runs), int(balls_used.max())
+    rows = np.arange(n)
+    all_out = lost >= wickets
+    reached = (stop > 0) & (runs >= stop)
+    ball = np.arange(width)[None, :]
+
+    # Wickets not pinned to the last ball fall on the free balls with the lowest random keys
+    keys = np.where(ball < (balls_used - (all_out | reached))[:, None], rng.random((n, width)), 2.0)
+    out = np.argsort(np.argsort(keys, axis=1), axis=1) < (lost - all_out)[:, None]
+    out[rows[all_out], balls_used[all_out] - 1] = True
+    bowled = ball < balls_used[:, None]
+    position = np.minimum(np.cumsum(out, axis=1) - out, slots - 1)  # Wickets before this ball
+    cell = (rows[:, None] * slots + position)[bowled]
+    faced = np.bincount(cell, minlength=n * slots).reshape(n, slots)
+    dismissed = np.bincount(cell, out[bowled], minlength=n * slots).reshape(n, slots).astype(np.int64)
+    scoring = faced - dismissed
+
+    table = run_sum_table(width, max_pick)
+    scored = np.zeros((n, slots), dtype=np.int64)
+    left, total = runs.copy(), scoring.sum(axis=1)
+    last = np.minimum(lost, slots - 1)
+    if reached.any():  # The last ball takes the score from below `stop` to `runs`
+        value = np.arange(max_pick + 1)[None, :]
+        before = runs[:, None] - value
+        valid = reached[:, None] & (value > runs[:, None] - stop[:, None]) & (before >= 0)
+        weights = np.where(valid, table[np.maximum(total - 1, 0)[:, None], np.maximum(before, 0)], 0.0)
+        final = np.where(reached, _pick(rng, weights), 0)
+        scored[rows, last] = final
+        scoring[rows, last] -= reached
+        left -= final
+        total -= reached
+    for slot in range(slots):
+        balls = scoring[:, slot]
+        total = total - balls
+        share = np.arange(int(min((balls * max_pick).max(), left.max())) + 1)[None, :]
+        rest = left[:, None] - share
+        valid = (share <= balls[:, None] * max_pick) & (rest >= 0) & (rest <= total[:, None] * max_pick)
+        weights = np.where(valid, table[balls[:, None], share] * table[total[:, None], np.clip(rest, 0, None)], 0.0)
+        taken = _pick(rng, weights)
+        scored[:, slot] += taken
+        left = left - taken
+    return scored, faced, dismissed
+
+
+class Squad:
+    """A team's 15 players and the XI in batting order; players have ids first_id .. first_id + 14."""
+
+    __slots__ = ("team", "players", "first_id", "xi")
+
+    def __init__(self, team, first_id=0, players=None):
+        self.team = team
+        self.players = list(players) if players else [f"{team} {i + 1}" for i in range(SQUAD_SIZE)]
+        self.first_id = first_id
+        self.xi = list(range(XI_SIZE))  # Squad numbers (0-based) in batting order
+
+    def pick_xi(self, numbers):
+        """Set the XI from 11 distinct 0-based squad numbers in batting order."""
+        numbers = list(numbers)
+        if len(numbers) != XI_SIZE or len(set(numbers)) != XI_SIZE or not all(0 <= i < SQUAD_SIZE for i in numbers):
+            raise ValueError(XI_RULE)
+        self.xi = numbers
+
+    def batting_order(self):
+        """Return the player ids of the XI in batting order."""
+        return [self.first_id + i for i in self.xi]
+
+
+class BattingCard:
+    """Scores one innings batter by batter into a BattingStats, as an event sink.
+
+    Every ball the innings emits is credited to the batter on strike and passed on
+    to `sink` (an EventLog, say) when one is given.
+    """
+
+    __slots__ = ("stats", "order", "sink", "wickets", "runs", "balls")
+
+    def __init__(self, stats, order, sink=None):
+        self.stats = stats
+        self.order = np.asarray(order)
+        self.sink = sink
+        self.wickets = 0
+        self.runs = np.zeros(len(order), dtype=np.int64)
+        self.balls = np.zeros(len(order), dtype=np.int64)
+        stats.innings[self.order[0]] += 1  # The opener is in
+
+    def emit(self, match_id, innings, ball, bat, bowl):
+        """Record a single ball."""
+        striker = self.order[self.wickets]
+        self.balls[self.wickets] += 1
+        self.stats.balls[striker] += 1
+        if bat == bowl:
+            self._dismiss(1)
+        else:
+            self.runs[self.wickets] += bat
+            self.stats.runs[striker] += bat
+        if self.sink is not None:
+            self.sink.emit(match_id, innings, ball, bat, bowl)
+
+    def emit_balls(self, match_id, innings, ball, bat, bowl):
+        """Record many balls of this innings at once."""
+        runs, balls, outs = batting_splits(bat, bowl, len(bat), self.wickets, len(self.order))
+        self.runs += runs[0]
+        self.balls += balls[0]
+        self.stats.runs[self.order] += runs[0]
+        self.stats.balls[self.order] += balls[0]
+        self._dismiss(int(outs.sum()))
+        if self.sink is not None:
+            self.sink.emit_balls(match_id, innings, ball, bat, bowl)
+
+    def _dismiss(self, count):
+        """Record `count` wickets falling in order and send in the next batters."""
+        for _ in range(count):
+            self.stats.dismissals[self.order[self.wickets]] += 1
+            self._close(self.wickets)
+            self.wickets += 1
+            if self.wickets < len(self.order):
+                self.stats.innings[self.order[self.wickets]] += 1
+
+    def _close(self, position):
+        """Update the high score of the batter at `position` once their innings is over."""
+        player = self.order[position]
+        self.stats.high_score[player] = max(self.stats.high_score[player], self.runs[position])
+
+    def finish(self):
+        """Close the innings of the batter still in."""
+        if self.wickets < len(self.order):
+            self._close(self.wickets)
+
+    def lines(self, names):
+        """Return (name, runs, balls, not out) for every batter who came in."""
+        batted = min(self.wickets + 1, len(self.order))
+        return [(names[self.order[i]], int(self.runs[i]), int(self.balls[i]), i == self.wickets)
+                for i in range(batted)]
+
+
+class Squads:
+    """Every team's squad in a tournament, with one BattingStats row per player."""
+
+    __slots__ = ("teams", "stats", "user_team", "drawn")
+
+    def __init__(self, teams, user_team=None):
+        self.teams = {team: Squad(team, i * SQUAD_SIZE) for i, team in enumerate(teams)}
+        self.stats = BattingStats(len(self.teams) * SQUAD_SIZE)
+        self.user_team = user_team
+        self.drawn = []  # Innings drawn whole, waiting for flush
+
+    def names(self):
+        """Return every player's name, indexed by player id."""
+        return [name for squad in self.teams.values() for name in squad.players]
+
+    def card(self, team, sink=None):
+        """Start the batting card of an innings by `team`, passing its balls on to `sink`."""
+        return BattingCard(self.stats, self.teams[team].batting_order(), sink)
+
+    def record_drawn(self, team, runs, balls_used, lost, wickets=WICKETS_PER_INNINGS, stop=None, max_pick=MAX_PICK):
+        """Queue an innings drawn whole for `team`; flush credits it to the XI."""
+        self.drawn.append((*self.teams[team].batting_order(), runs, balls_used, lost, wickets, stop or 0, max_pick))
+
+    def flush(self, rng):
+        """Split the queued innings between their batters with split_innings and add them to the stats."""
+        if not self.drawn:
+            return
+        drawn = np.array(self.drawn, dtype=np.int64)
+        self.drawn = []
+        players, (runs, balls_used, lost, wickets, stop, max_pick) = drawn[:, :XI_SIZE], drawn[:, XI_SIZE:].T
+        for pick in np.unique(max_pick).tolist():
+            rows = max_pick == pick
+            split = split_innings(rng, runs[rows], balls_used[rows], lost[rows], wickets[rows], stop[rows], pick)
+            batted = np.arange(XI_SIZE)[None, :] <= lost[rows, None]  # Positions 0..lost came in
+            self.stats.record_innings(players[rows][batted], *(column[batted] for column in split))
@@ -0,0 +1,208 @@
+import struct
+
+import numpy as np
+
+from innings_engine import BALLS_PER_INNINGS, WICKETS_PER_INNINGS
+
+
+def sort_key(points, wins, nrr, position):
+    """Pack the tie-break order into one int: Points, then Wins, then NRR, then group position.
+
+    Larger keys rank higher. NRR is mapped to an order-preserving 64-bit integer, so
+    comparing two keys gives the same answer as a stable multi-column sort.
+    """
+    bits = struct.unpack("<q", struct.pack("<d", nrr + 0.0))[0]  # + 0.0 folds -0.0 into 0.0
+    if bits < 0:
+        bits ^= 0x7FFF_FFFF_FFFF_FFFF
+    return (((points << 32 | wins) << 64 | (bits + (1 << 63))) << 32) | (0xFFFF_FFFF - position)
+
+
+class GroupTable:
+    """Points table for one group, stored as NumPy columns indexed by team position.
+
+    The ranking is kept up to date incrementally: after each result only the two
+    teams involved are moved to their new place, so reads never need a sort.
+    """
+
+    __slots__ = ("teams", "_index", "wins", "losses", "draws", "points", "nrr", "_order", "_rank", "_keys")
+
+    COLUMNS = ("Wins", "Losses", "Draws", "Points", "Net Run Rate")
+
+    def __init__(self, teams):
+        self.teams = list(teams)
+        self._index = {team: i for i, team in enumerate(self.teams)}
+        size = len(self.teams)
+        self.wins = np.zeros(size, dtype=np.int64)
+        self.losses = np.zeros(size, dtype=np.int64)
+        self.draws = np.zeros(size, dtype=np.int64)
+        self.points = np.zeros(size, dtype=np.int64)
+        self.nrr = np.zeros(size, dtype=np.float64)
+        self._order = list(range(size))  # Team positions in ranked order
+        self._rank = list(range(size))  # Ranked place of each team position
+        self._keys = [sort_key(0, 0, 0.0, i) for i in range(size)]
+
+    @classmethod
+    def restore(cls, teams, wins, losses, draws, points, nrr):
+        """Rebuild a table from saved columns; the ranking is recomputed from them."""
+        table = cls(teams)
+        table.wins[:], table.losses[:], table.draws[:] = wins, losses, draws
+        table.points[:], table.nrr[:] = points, nrr
+        for team in range(len(table.teams)):
+            table._reposition(team)
+        return table
+
+    def __contains__(self, team):
+        return team in self._index
+
+    def __len__(self):
+        return len(self.teams)
+
+    def record_result(self, team1, team2, team1_score, team2_score, team1_overs, team2_overs, drawn=False):
+        """Add one match result to the table in place; the higher score wins unless the match was `drawn`."""
+        i, j = self._index[team1], self._index[team2]
+        margin = 0 if drawn else team1_score - team2_score
+        if margin > 0:
+            self.wins[i] += 1
+            self.points[i] += 2
+            self.losses[j] += 1
+        elif margin < 0:
+            self.wins[j] += 1
+            self.points[j] += 2
+            self.losses[i] += 1
+        else:
+            self.draws[i] += 1
+            self.draws[j] += 1
+            self.points[i] += 1
+            self.points[j] += 1
+
+        team1_nrr = (team1_score / team1_overs) - (team2_score / team2_overs)
+        self.nrr[i] += team1_nrr
+        self.nrr[j] -= team1_nrr
+        self._reposition(i)
+        self._reposition(j)
+
+    def _reposition(self, team):
+        """Refresh a team's sort key and slide it to its new place in the ranking."""
+        key = self._keys[team] = sort_key(int(self.points[team]), int(self.wins[team]), float(self.nrr[team]), team)
+        order, rank, keys = self._order, self._rank, self._keys
+        place = rank[team]
+        while place > 0 and keys[order[place - 1]] < key:
+            order[place] = order[place - 1]
+            rank[order[place]] = place
+            place -= 1
+        while place < len(order) - 1 and keys[order[place + 1]] > key:
+            order[place] = order[place + 1]
+            rank[order[place]] = place
+            place += 1
+        order[place] = team
+        rank[team] = place
+
+    def ranking(self):
+        """Return team positions ordered by Points, Wins and Net Run Rate (ties keep group order)."""
+        return self._order
+
+    def standings(self):
+        """Return the team names in ranked order."""
+        return [self.teams[i] for i in self.ranking()]
+
+    def top(self, k):
+        """Return the top k team names in O(k)."""
+        return [self.teams[self._order[place]] for place in range(min(k, len(self._order)))]
+
+    def to_dataframe(self):
+        """Export the ranked table as a pandas DataFrame."""
+        import pandas as pd  # Only needed for display and export
+
+        order = self.ranking()
+        columns = (self.wins, self.losses, self.draws, self.points, self.nrr)
+        return pd.DataFrame(
+            {name: column[order] for name, column in zip(self.COLUMNS, columns)},
+            index=[self.teams[i] for i in order],
+        )
+
+
+# Whole group stages of many simulated tournaments at once. Team slots 0..n-1
+# index the columns, with the teams of each group in consecutive slots as
+# split_groups lays them out; every result array is (tournaments, fixtures).
+def batch_tables(team1, team2, team1_score, team2_score, team1_balls, team2_balls, n_teams,
+                 team1_wickets=None, team2_wickets=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS,
+                 drawn=None):
+    """Return (wins, losses, draws, points, nrr) columns of shape (tournaments, n_teams).
+
+    `team1` and `team2` are the fixtures' team slots, either one schedule of shape
+    (fixtures,) shared by every tournament or one per tournament. NRR is the
+    aggregate definition: runs scored per over faced minus runs conceded per over
+    bowled, with a side that was bowled out charged its full `balls` (None, as in
+    Tests, charges the balls faced). As in GroupTable.record_result, a match marked
+    in `drawn` is a draw whatever the scores.
+    """
+    team1_score, team2_score = np.asarray(team1_score), np.asarray(team2_score)
+    n_runs = team1_score.shape[0]
+    size = n_runs * n_teams
+    rows = np.arange(n_runs)[:, None] * n_teams
+    slot1 = (rows + np.broadcast_to(team1, team1_score.shape)).ravel()
+    slot2 = (rows + np.broadcast_to(team2, team1_score.shape)).ravel()
+    score1, score2 = team1_score.ravel(), team2_score.ravel()
+    faced1 = np.asarray(team1_balls).ravel()
+    faced2 = np.asarray(team2_balls).ravel()
+    if team1_wickets is not None and balls is not None:
+        faced1 = np.where(np.asarray(team1_wickets).ravel() >= wickets, balls, faced1)
+    if team2_wickets is not None and balls is not None:
+        faced2 = np.where(np.asarray(team2_wickets).ravel() >= wickets, balls, faced2)
+
+    def tally(weights1, weights2):
+        return (np.bincount(slot1, weights1, minlength=size) + np.bincount(slot2, weights2, minlength=size)) \
+            .reshape(n_runs, n_teams)
+
+    decided = True if drawn is None else ~np.broadcast_to(np.asarray(drawn, dtype=bool), team1_score.shape).ravel()
+    won1, won2 = decided & (score1 > score2), decided & (score2 > score1)
+    level = ~(won1 | won2)
+    wins = tally(won1, won2).astype(np.int64)
+    losses = tally(won2, won1).astype(np.int64)
+    draws = tally(level, level).astype(np.int64)
+    runs_for, runs_against = tally(score1, score2), tally(score2, score1)
+    balls_faced, balls_bowled = tally(faced1, faced2), tally(faced2, faced1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nrr = 6 * (runs_for / balls_faced - runs_against / balls_bowled)
+    nrr[balls_faced == 0] = 0.0  # No matches played yet
+    return wins, losses, draws, 2 * wins + draws, nrr
+
+
+def batch_rankings(group_of, wins, points, nrr):
+    """Return the (tournaments, n_teams) team slots ranked within each group, groups in slot order.
+
+    A single lexsort over every (tournament, group, team) ranks all groups of all
+    tournaments, with GroupTable's tie-breaks: Points, then Wins, then NRR, then
+    position in the group.
+    """
+    n_runs, n_teams = points.shape
+    shape = (n_runs, n_teams)
+    keys = (np.broadcast_to(np.arange(n_teams), shape), -nrr, -wins, -points,
+            np.broadcast_to(group_of, shape), np.broadcast_to(np.arange(n_runs)[:, None], shape))
+    order = np.lexsort([key.ravel() for key in keys])
+    return (order % n_teams).reshape(shape)
+
+
+def batch_qualifiers(group_of, wins, points, nrr, advance=2):
+    """Return the (tournaments, groups, advance) team slots going through from each group, best first."""
+    group_of = np.asarray(group_of)
+    ranking = batch_rankings(group_of, wins, points, nrr)
+    sizes = np.bincount(group_of)
+    starts = np.cumsum(sizes) - sizes
+    return ranking[:, (starts[:, None] + np.arange(advance)).ravel()].reshape(len(ranking), len(sizes), advance)
+
+
+def batch_semifinalists(group_of, team1, team2, team1_score, team2_score, team1_balls, team2_balls,
+                        team1_wickets=None, team2_wickets=None, balls=BALLS_PER_INNINGS, wickets=WICKETS_PER_INNINGS,
+                        drawn=None):
+    """Return determine_semifinalists' (team1, team2, team3, team4) as arrays of team slots, one per tournament.
+
+    Takes the results of whole two-group stages for many tournaments, as for
+    batch_tables (`balls` and `wickets` being the match format's), and returns
+    the top two of the first group and the top two of the second.
+    """
+    group_of = np.asarray(group_of)
+    wins, _, _, points, nrr = batch_tables(team1, team2, team1_score, team2_score, team1_balls, team2_balls,
+                                           len(group_of), team1_wickets, team2_wickets, balls, wickets, drawn)
+    qualifiers = batch_qualifiers(group_of, wins, points, nrr, 2)
+    return tuple(qualifiers.reshape(len(qualifiers), -1).T)
@@ -0,0 +1,122 @@
+from innings_engine import MAX_PICK
+
+
+# Computer opponents for the ball-by-ball innings. Every ball the human and the
+# computer each pick 0..MAX_PICK: when the computer bowls it wants to match the
+# human's pick (a wicket), when it bats it wants runs without being matched.
+# Policies learn from the human's picks through counters updated once per ball,
+# so choosing a number costs the same however long the game has run.
+PICKS = MAX_PICK + 1
+
+
+class UniformPolicy:
+    """Easy: picks uniformly at random and learns nothing."""
+
+    __slots__ = ()
+
+    def pick(self, rng, batting=False):
+        """Return the computer's number for the next ball."""
+        return rng.randint(0, MAX_PICK)
+
+    def observe(self, pick):
+        """Learn the human's number for the ball just played."""
+
+
+class FrequencyPolicy:
+    """Medium: predicts the human's next number from how often they have picked each one."""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = [1] * PICKS  # Start from one of each so an unseen number is never ruled out
+
+    def predict(self):
+        """Return the human's pick counts the prediction is based on."""
+        return self.counts
+
+    def pick(self, rng, batting=False):
+        """Return the computer's number for the next ball."""
+        return _respond(self.predict(), rng, batting)
+
+    def observe(self, pick):
+        """Learn the human's number for the ball just played."""
+        self.counts[pick] += 1
+
+
+class NGramPolicy(FrequencyPolicy):
+    """Hard: predicts the human's next number from what followed their last `order` numbers before.
+
+    Counts are kept per context of recent picks; a context seen fewer than
+    `min_seen` times falls back to the overall frequencies.
+    """
+
+    __slots__ = ("order", "min_seen", "history", "contexts")
+
+    def __init__(self, order=2, min_seen=3):
+        super().__init__()
+        self.order = order
+        self.min_seen = min_seen
+        self.history = ()
+        self.contexts = {}  # Recent picks -> counts of the pick that followed
+
+    def predict(self):
+        """Return the human's pick counts the prediction is based on."""
+        counts = self.contexts.get(self.history)
+        if counts is None or sum(counts) < self.min_seen:
+            return self.counts
+        return counts
+
+    def observe(self, pick):
+        """Learn the human's number for the ball just played."""
+        if len(self.history) == self.order:
+            counts = self.contexts.get(self.history)
+            if counts is None:
+                counts = self.contexts[self.history] = [0] * PICKS
+            counts[pick] += 1
+        self.history = (self.history + (pick,))[-self.order:]
+        super().observe(pick)
+
+
+def _respond(counts, rng, batting):
+    """Return a number against predicted pick counts, drawn in proportion to how well each one does.
+
+    Bowling, a number is as likely as the human is predicted to pick it.
+    Batting, it is weighted by the runs it is expected to score,
+    value * (1 - chance the human picks it). Never settling on one answer
+    keeps the computer from being read and exploited.
+    """
+    if batting:
+        total = sum(counts)
+        scores = [value * (total - count) for value, count in enumerate(counts)]
+    else:
+        scores = counts
+    x = rng.random() * sum(scores)
+    for value, score in enumerate(scores):
+        x -= score
+        if x < 0:
+            return value
+    return max(range(PICKS), key=scores.__getitem__)  # Rounding left x at 0
+
+
+DIFFICULTIES = {"easy": UniformPolicy, "medium": FrequencyPolicy, "hard": NGramPolicy}
+
+
+class Opponent:
+    """The computer's bowling and batting policies against one human player."""
+
+    __slots__ = ("difficulty", "bowler", "batter")
+
+    def __init__(self, difficulty="easy"):
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty {difficulty!r}, choose from {sorted(DIFFICULTIES)}.")
+        self.difficulty = difficulty
+        self.bowler = DIFFICULTIES[difficulty]()  # Learns the human's batting picks
+        self.batter = DIFFICULTIES[difficulty]()  # Learns the human's bowling guesses
+
+
+_default_opponent = Opponent()
+
+
+def get_opponent(opponent=None):
+    """Return `opponent`, or the shared easy opponent when it is None."""
+    return _default_opponent if opponent is None else opponent
@@ -0,0 +1,187 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from formats import FORMATS
+from innings_engine import MAX_PICK, WICKETS_PER_INNINGS
+from match_engine import MATCH_FORMATS, MatchFormat
+from match_model import MatchModel
+from tournament import count_results, probabilities
+
+
+# Sensitivity sweeps: headless tournament batches over a grid of model settings.
+# Each cell's result is cached on disk under a hash of its settings, the batch
+# (teams, runs, seed, RNG backend) and the source of every module that shapes a
+# result, so re-running a sweep with one axis changed only plays the new cells
+# and any code change starts afresh. Cells run in parallel, one per worker, and
+# are reported as they finish.
+PARAMS = {
+    "format": "t20",  # Tournament format, a key of formats.FORMATS
+    "match_format": "t20",  # Key of match_engine.MATCH_FORMATS
+    "max_pick": MAX_PICK,  # Numbers each side picks from, 0..max_pick
+    "wickets": WICKETS_PER_INNINGS,  # Wickets per innings
+    "balls": None,  # Balls per innings; None keeps the match format's
+}
+CODE = ("formats", "innings_dp", "innings_engine", "match_engine", "match_model", "outcome_cache", "rng",
+        "standings", "sweep", "tournament")
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+_code_version = None
+
+
+def code_version():
+    """Return a hash of the source of every module that affects a sweep result."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for name in CODE:
+            with open(os.path.join(ROOT, f"{name}.py"), "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def parse_axis(text):
+    """Parse "name=v1,v2,..." into (name, [values]); numeric settings become ints and "none" None."""
+    name, _, values = text.partition("=")
+    if name not in PARAMS or not values:
+        raise ValueError(f"Expected NAME=V1,V2,... with NAME one of {', '.join(PARAMS)}, got {text!r}.")
+    if isinstance(PARAMS[name], str):
+        return name, values.split(",")
+    return name, [None if value.lower() == "none" else int(value) for value in values.split(",")]
+
+
+def expand(axes):
+    """Return every cell of the grid spanned by `axes` ({name: values}) as a full settings dict."""
+    names = list(axes)
+    return [{**PARAMS, **dict(zip(names, values))} for values in itertools.product(*axes.values())]
+
+
+def cell_match_format(cell):
+    """Return the MatchFormat a cell's matches are played in."""
+    base = MATCH_FORMATS[cell["match_format"]]
+    if base.balls is None and (cell["balls"] is not None or cell["max_pick"] != MAX_PICK):
+        # Innings with no ball limit are simulated ball by ball, which always picks 0..MAX_PICK
+        raise ValueError(f"{base.name} matches only support the default balls and max_pick.")
+    return MatchFormat(base.name, cell["balls"] or base.balls, cell["wickets"], base.innings, base.match_balls,
+                       base.follow_on, base.declare_lead)
+
+
+def validate(cell, n_teams):
+    """Raise ValueError if a cell's settings cannot be played with n_teams teams."""
+    if cell["format"] not in FORMATS or cell["match_format"] not in MATCH_FORMATS:
+        raise ValueError(f"Unknown format in {cell}; tournament formats are {', '.join(FORMATS)}, "
+                         f"match formats {', '.join(MATCH_FORMATS)}.")
+    FORMATS[cell["format"]].validate(n_teams)
+    cell_match_format(cell)
+
+
+def cell_key(cell, teams, n_runs, seed, backend):
+    """Return the cache key of one cell of a sweep."""
+    fields = {"cell": cell, "teams": list(teams), "runs": n_runs, "seed": seed, "backend": backend,
+              "code": code_version()}
+    return hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+
+
+def load_cell(cache_dir, key):
+    """Return the cached result stored under `key`, or None."""
+    try:
+        with open(os.path.join(cache_dir, f"{key}.json")) as f:
+            return json.load(f)["result"]
+    except (OSError, ValueError, KeyError):
+        return None  # Missing or unreadable: play the cell again
+
+
+def store_cell(cache_dir, key, cell, result):
+    """Save one cell's result atomically, so an interrupted sweep never leaves a half-written entry."""
+    path = os.path.join(cache_dir, f"{key}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"cell": cell, "result": result}, f)
+    os.replace(tmp, path)
+
+
+def run_cell(cell, teams, n_runs, seed, backend="pcg64"):
+    """Play n_runs tournaments with a cell's settings and return per-team probabilities."""
+    match_format = cell_match_format(cell)
+    fmt = FORMATS[cell["format"]]
+    model = MatchModel(wickets=cell["wickets"], max_pick=cell["max_pick"])
+    counts = count_results(teams, 0, n_runs, seed, backend, fmt, model, match_format)
+    return probabilities(teams, *counts, n_runs)
+
+
+def sweep(cells, teams, n_runs, seed=0, workers=1, cache_dir=None, backend="pcg64"):
+    """Yield (cell, result, cached) for every cell, cached ones first and the rest as they finish.
+
+    Every cell plays the same tournaments (streams of `seed`), so differences
+    between cells come from the settings alone.
+    """
+    teams = list(teams)
+    for cell in cells:
+        validate(cell, len(teams))  # Fail before starting any workers
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    pending = []
+    for cell in cells:
+        key = cell_key(cell, teams, n_runs, seed, backend)
+        result = load_cell(cache_dir, key) if cache_dir else None
+        if result is None:
+            pending.append((key, cell))
+        else:
+            yield cell, result, True
+
+    def finished(key, cell, result):
+        if cache_dir:
+            store_cell(cache_dir, key, cell, result)
+        return cell, result, False
+
+    if workers <= 1 or len(pending) <= 1:
+        for key, cell in pending:
+            yield finished(key, cell, run_cell(cell, teams, n_runs, seed, backend))
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = {pool.submit(run_cell, cell, teams, n_runs, seed, backend): (key, cell) for key, cell in pending}
+        for future in as_completed(futures):
+            yield finished(*futures[future], future.result())
+
+
+def describe(cell, axes):
+    """Return the swept settings of a cell as "name=value" pairs."""
+    return " ".join(f"{name}={cell[name]}" for name in axes) or "defaults"
+
+
+def main():
+    """Run a parameter sweep from the command line."""
+    parser = argparse.ArgumentParser(description="Sweep model settings and compare tournament probabilities.")
+    parser.add_argument("axes", nargs="*", metavar="NAME=V1,V2,...",
+                        help=f"settings to sweep, from {', '.join(PARAMS)}; unswept ones keep their defaults")
+    parser.add_argument("-t", "--team-count", type=int, default=8, help="teams per tournament")
+    parser.add_argument("-n", "--runs", type=int, default=2000, help="tournaments per cell")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="cells played at once in worker processes")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="master seed shared by every cell")
+    parser.add_argument("--rng", choices=["pcg64", "philox"], default="pcg64", help="random number backend")
+    parser.add_argument("--cache-dir", default=".sweep_cache", metavar="DIR",
+                        help="keep cell results here and reuse them; an empty string turns caching off")
+    args = parser.parse_args()
+
+    try:
+        axes = dict(parse_axis(text) for text in args.axes)
+        cells = expand(axes)
+        for cell in cells:
+            validate(cell, args.team_count)
+    except ValueError as error:
+        parser.error(str(error))
+    teams = [f"Team {i + 1}" for i in range(args.team_count)]
+    print(f"{len(cells)} cells of {args.runs} tournaments; title and semifinal chances per team")
+    for cell, result, cached in sweep(cells, teams, args.runs, args.seed, args.workers, args.cache_dir, args.rng):
+        titles = " ".join(f"{result[team]['title']:6.1%}" for team in teams)
+        semifinals = " ".join(f"{result[team]['semifinal']:6.1%}" for team in teams)
+        print(f"{describe(cell, axes)}{' (cached)' if cached else ''}\n  title     {titles}\n  semifinal {semifinals}",
+              flush=True)
+
+
+if __name__ == "__main__":
+    main()
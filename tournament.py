@@ -0,0 +1,277 @@
+import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from formats import FORMATS, T20_WORLD_CUP, play_format, split_groups
+from match_engine import MATCH_FORMATS, simulate_knockout, simulate_match
+from match_model import CACHE_SIZE, MatchModel, get_model
+from outcome_cache import OutcomeCache, TableStore
+from profiling import enable_from as enable_profiling, finish as finish_profiling, timed
+from rng import GameRNG
+from snapshot import BatchState, load_batch, save_batch
+from squad import Squads
+
+
+# Headless computer-only tournaments for Monte Carlo runs.
+# Matches come from the same match engine as the computer branches of main.py:
+# the first team bats first, group ties and draws are shared and knockout ties
+# and draws go to a super over. `match_format` is a key of MATCH_FORMATS (or,
+# for play_headless_tournament and count_results, a MatchFormat).
+CHECKPOINT_RUNS = 20000  # Runs between checkpoints; a snapshot costs well under 1% of that
+
+
+@timed("tournament")
+def play_headless_tournament(teams, rng, fmt=T20_WORLD_CUP, model=None, match_format="t20", squads=None):
+    """Play one computer-only tournament in `fmt` and return the play_format result; `squads` get the batting."""
+    model = get_model(model)
+    match_format = MATCH_FORMATS[match_format] if isinstance(match_format, str) else match_format
+    order = [teams[i] for i in rng.permutation(len(teams))]
+
+    def play_group_match(team1, team2):
+        result = simulate_match(match_format, rng, team1, team2, model, squads=squads)
+        return (result.totals[team1], result.totals[team2], result.faced[team1] / 6, result.faced[team2] / 6,
+                result.drawn)
+
+    def play_knockout_match(team1, team2):
+        return simulate_knockout(match_format, rng, team1, team2, model, squads=squads)[1]
+
+    return play_format(order, fmt, play_group_match, play_knockout_match)
+
+
+def _semifinalists(result):
+    """Return the four teams of the last-four round, or every entrant of a smaller knockout."""
+    entrants = [result["knockout"]] + result["rounds"][:-1]
+    return next((teams for teams in entrants if len(teams) == 4), result["knockout"])
+
+
+@lru_cache(maxsize=None)
+def _cached_model(cache_path, store_path=None):
+    """Return this process's MatchModel backed by the SQLite tables at `cache_path` and the shared store."""
+    store = TableStore.open(store_path) if store_path else None
+    return MatchModel(OutcomeCache(CACHE_SIZE, cache_path, store))
+
+
+def _share_tables(path, match_format, cache_path=None):
+    """Build the likely match tables of `match_format` once into a TableStore at `path`; return the path or None.
+
+    Workers memory-map the store, so its pages are shared instead of every
+    worker building and holding its own copy of the same tables.
+    """
+    balls = MATCH_FORMATS[match_format].balls
+    if balls is None:
+        return None  # Open-ended Test innings are simulated, not drawn from tables
+    if not TableStore.exists(path):
+        MatchModel(OutcomeCache(1, cache_path), balls=balls).share(path)  # Hold one table at a time
+    return path
+
+
+def _run_worker(teams, start, stop, seed, backend, fmt=T20_WORLD_CUP, cache_path=None, match_format="t20",
+                batting=False, store_path=None):
+    """Play tournaments start..stop-1 of a batch in a worker process; return raw counts and BattingStats or None."""
+    model = _cached_model(cache_path, store_path) if cache_path or store_path else None
+    squads = Squads(teams) if batting else None
+    counts = count_results(teams, start, stop, seed, backend, fmt, model, match_format, squads)
+    return (*counts, squads.stats if batting else None)
+
+
+def count_results(teams, start, stop, seed, backend="pcg64", fmt=T20_WORLD_CUP, model=None, match_format="t20",
+                  squads=None):
+    """Play tournaments start..stop-1 of a batch with `model` and return (titles, semifinals, finishes) counts.
+
+    With `squads` (a Squads over `teams`) every innings is also credited to its
+    side's batters. Their splits draw from a stream of their own, so the counts
+    are the same with or without them.
+    """
+    master = GameRNG(seed, backend)
+    model = get_model(model)
+    index = {team: i for i, team in enumerate(teams)}
+    titles = np.zeros(len(teams), dtype=np.int64)
+    semifinals = np.zeros(len(teams), dtype=np.int64)
+    group_size = max(len(group) for group in split_groups(teams, fmt.groups))
+    finishes = np.zeros((len(teams), group_size), dtype=np.int64)
+    for run in range(start, stop):
+        result = play_headless_tournament(teams, master.stream(run), fmt, model, match_format, squads)
+        if squads is not None:
+            squads.flush(master.stream(run, 1))
+        for group in result["stages"][0].standings():
+            for position, team in enumerate(group):
+                finishes[index[team], position] += 1
+        for team in _semifinalists(result):
+            semifinals[index[team]] += 1
+        titles[index[result["champion"]]] += 1
+    return titles, semifinals, finishes
+
+
+def _split_runs(n_runs, workers):
+    """Split range(n_runs) into `workers` contiguous (start, stop) chunks."""
+    base, extra = divmod(n_runs, workers)
+    bounds = [0]
+    for i in range(workers):
+        bounds.append(bounds[-1] + base + (i < extra))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def replay_tournament(teams, seed, run, backend="pcg64", fmt=T20_WORLD_CUP, match_format="t20"):
+    """Replay tournament number `run` of a batch bit-for-bit."""
+    return play_headless_tournament(list(teams), GameRNG(seed, backend).stream(run), fmt, match_format=match_format)
+
+
+def _format_key(fmt):
+    """Return the fields of a TournamentFormat as a tuple, as stored in batch snapshots."""
+    return fmt.groups, fmt.legs, fmt.advance, fmt.super_groups, fmt.super_advance
+
+
+def _resume_batch(checkpoint, teams, n_runs, seed, backend, fmt, match_format):
+    """Return the BatchState saved at `checkpoint`, checking it belongs to this batch."""
+    state = load_batch(checkpoint)
+    if (state.teams, state.fmt, state.backend, state.n_runs, state.match_format) \
+            != (teams, _format_key(fmt), backend, n_runs, match_format) \
+            or (seed is not None and state.seed != GameRNG(seed).seed):
+        raise ValueError(f"{checkpoint} was written by a different batch.")
+    return state
+
+
+def simulate_tournament(teams, n_runs, workers=1, seed=None, backend="pcg64", fmt=T20_WORLD_CUP,
+                        checkpoint=None, checkpoint_every=CHECKPOINT_RUNS, outcome_cache=None, match_format="t20",
+                        squads=None):
+    """Simulate n_runs computer-only tournaments and return per-team probabilities.
+
+    Tournament i draws from stream i of the master seed, so results do not depend
+    on the number of workers and any single tournament can be replayed. With a
+    `checkpoint` path the counts so far are saved every `checkpoint_every` runs,
+    and a batch interrupted there carries on from its last snapshot. With an
+    `outcome_cache` path the workers share their match tables through that file.
+    With more than one worker the likely tables are built once, before the
+    workers start, into a store they all memory-map (kept next to
+    `outcome_cache` for later batches, or in a temporary directory). Every
+    match is played in `match_format`, a key of MATCH_FORMATS. With `squads`,
+    a Squads over `teams`, every batter's figures over the batch are added to
+    squads.stats; checkpoints do not keep them, so the two cannot be combined.
+    """
+    teams = list(teams)
+    fmt.validate(len(teams))
+    MATCH_FORMATS[match_format]  # Fail before starting any workers
+    if squads is not None and checkpoint:
+        raise ValueError("Batting figures are not saved in checkpoints; gather them without --checkpoint.")
+    if checkpoint and os.path.exists(checkpoint):
+        state = _resume_batch(checkpoint, teams, n_runs, seed, backend, fmt, match_format)
+        seed = state.seed
+    else:
+        seed = GameRNG(seed).seed  # Fix the entropy here so every worker shares it
+        group_size = max(len(group) for group in split_groups(teams, fmt.groups))
+        state = BatchState(teams, _format_key(fmt), seed, backend, n_runs, 0, np.zeros(len(teams), dtype=np.int64),
+                           np.zeros(len(teams), dtype=np.int64), np.zeros((len(teams), group_size), dtype=np.int64),
+                           match_format)
+
+    remaining = n_runs - state.done
+    workers = max(1, min(workers, remaining))
+    if checkpoint:
+        # Every checkpoint interval is split between all the workers; a snapshot is saved when one is complete
+        intervals = [(start, min(start + checkpoint_every, n_runs))
+                     for start in range(state.done, n_runs, checkpoint_every)]
+        saves = {stop for _, stop in intervals}
+        chunks = [(start + low, start + high) for start, stop in intervals
+                  for low, high in _split_runs(stop - start, workers) if high > low]
+    else:
+        chunks = [(state.done + start, state.done + stop) for start, stop in _split_runs(remaining, workers)]
+
+    def record(results):
+        for (_, stop), (titles, semifinals, finishes, stats) in zip(chunks, results):
+            if squads is not None:
+                squads.stats.merge(stats)
+            state.titles += titles
+            state.semifinals += semifinals
+            state.finishes += finishes
+            state.done = stop
+            if checkpoint and stop in saves:
+                save_batch(checkpoint, state)
+
+    starts, stops = zip(*chunks) if chunks else ((), ())
+    args = ([teams] * len(chunks), starts, stops, [seed] * len(chunks), [backend] * len(chunks), [fmt] * len(chunks),
+            [outcome_cache] * len(chunks), [match_format] * len(chunks), [squads is not None] * len(chunks))
+    if workers == 1:
+        record(map(_run_worker, *args))
+    else:
+        with tempfile.TemporaryDirectory() as scratch:
+            store_path = f"{outcome_cache}.{match_format}.tables" if outcome_cache \
+                else os.path.join(scratch, f"outcomes.{match_format}.tables")
+            with ProcessPoolExecutor(max_workers=1) as builder:  # Workers fork from a parent that never held the build
+                store_path = builder.submit(_share_tables, store_path, match_format, outcome_cache).result()
+            args += ([store_path] * len(chunks),)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                record(pool.map(_run_worker, *args))
+
+    return probabilities(teams, state.titles, state.semifinals, state.finishes, n_runs)
+
+
+def probabilities(teams, titles, semifinals, finishes, n_runs):
+    """Turn the counts of n_runs tournaments into per-team title, semifinal and group-finish probabilities."""
+    return {
+        team: {
+            "title": titles[i] / n_runs,
+            "semifinal": semifinals[i] / n_runs,
+            "group_finish": (finishes[i] / n_runs).tolist(),
+        }
+        for i, team in enumerate(teams)
+    }
+
+
+def display_probabilities(probabilities):
+    """Display the aggregated tournament probabilities."""
+    print("\n--- Tournament Probabilities ---")
+    for team, result in sorted(probabilities.items(), key=lambda item: -item[1]["title"]):
+        finishes = " ".join(f"{p:6.1%}" for p in result["group_finish"])
+        print(f"{team:<20} title {result['title']:6.1%}  semifinal {result['semifinal']:6.1%}  group finish {finishes}")
+
+
+def display_batting(squads, count):
+    """Display the batch figures of the `count` batters with the most runs."""
+    print(f"\n--- Top {count} Batters ---")
+    print(squads.stats.to_dataframe(squads.names()).head(count))
+
+
+def main():
+    """Run the headless tournament simulation from the command line."""
+    parser = argparse.ArgumentParser(description="Simulate computer-only cricket World Cups.")
+    parser.add_argument("teams", nargs="*", help="team names (default: Team 1 .. Team N)")
+    parser.add_argument("-t", "--team-count", type=int, default=8, help="N when no team names are given")
+    parser.add_argument("-f", "--format", choices=list(FORMATS), default="t20", help="tournament format")
+    parser.add_argument("--match-format", choices=list(MATCH_FORMATS), default="t20",
+                        help="format of every match: T20, ODI or two-innings Test")
+    parser.add_argument("-n", "--runs", type=int, default=10000, help="number of tournaments")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="master seed")
+    parser.add_argument("--rng", choices=["pcg64", "philox"], default="pcg64", help="random number backend")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH",
+                        help="save progress here periodically and resume from it after a crash")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_RUNS, help="runs between checkpoints")
+    parser.add_argument("--outcome-cache", default=None, metavar="PATH",
+                        help="keep the match outcome tables in this SQLite file, shared by workers and later runs")
+    parser.add_argument("--profile", nargs="?", const="1", default=None, metavar="TRACE.json",
+                        help="print per-phase timings at the end (and write a Chrome trace to TRACE.json); "
+                             "HTG_PROFILE does the same. Only covers work done in this process (-w 1)")
+    parser.add_argument("--batting", nargs="?", type=int, const=20, default=None, metavar="N",
+                        help="credit every innings to default squads and print the N batters with the most runs")
+    args = parser.parse_args()
+    if args.batting is not None and args.checkpoint:
+        parser.error("--batting cannot be combined with --checkpoint; batting figures are not saved in checkpoints.")
+    enable_profiling(args.profile)
+
+    teams = args.teams or [f"Team {i + 1}" for i in range(args.team_count)]
+    squads = Squads(teams) if args.batting is not None else None
+    display_probabilities(simulate_tournament(teams, args.runs, workers=args.workers, seed=args.seed,
+                                              backend=args.rng, fmt=FORMATS[args.format],
+                                              checkpoint=args.checkpoint, checkpoint_every=args.checkpoint_every,
+                                              outcome_cache=args.outcome_cache, match_format=args.match_format,
+                                              squads=squads))
+    if squads is not None:
+        display_batting(squads, args.batting)
+    finish_profiling()
+
+
+if __name__ == "__main__":
+    main()